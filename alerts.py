@@ -0,0 +1,62 @@
+"""Подавление повторных уведомлений о сбоях."""
+from __future__ import annotations
+
+import re
+import time
+from typing import Dict, Optional, Tuple
+
+from settings import DEFAULTS
+
+NUMBERS = re.compile(r"\d+")
+SPACES = re.compile(r"\s+")
+
+
+def fingerprint(error: BaseException) -> str:
+    """Метод получения отпечатка сбоя: тип и сообщение без чисел."""
+    message = NUMBERS.sub("#", str(error))
+    return f"{type(error).__name__}:{SPACES.sub(' ', message).strip()}"
+
+
+class ErrorNotifier:
+    """Решает, стоит ли сообщать о сбое подписчику.
+
+    Первый сбой с новым отпечатком отправляется сразу, повторы
+    подавляются в окне, которое удваивается после каждого уведомления
+    от ``window`` до ``max_window``. После первого успешного цикла
+    ``recover`` один раз сообщает о восстановлении.
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULTS.alert_window,
+        max_window: int = DEFAULTS.alert_max_window,
+    ):
+        self.window = window
+        self.max_window = max_window
+        self._seen: Dict[str, Tuple[float, int, int]] = {}
+
+    def check(
+        self, error: BaseException, now: Optional[float] = None
+    ) -> Optional[str]:
+        """Метод проверки сбоя: текст уведомления или None."""
+        now = time.time() if now is None else now
+        key = fingerprint(error)
+        if key not in self._seen:
+            self._seen[key] = (now + self.window, self.window, 0)
+            return f"Сбой в работе программы: {error}"
+        deadline, window, suppressed = self._seen[key]
+        if now < deadline:
+            self._seen[key] = (deadline, window, suppressed + 1)
+            return None
+        window = min(window * 2, self.max_window)
+        self._seen[key] = (now + window, window, 0)
+        return (
+            f"Сбой в работе программы: {error} "
+            f"(повторов без уведомления: {suppressed})"
+        )
+
+    def recover(self) -> bool:
+        """Метод сброса состояния после успешного цикла."""
+        failing = bool(self._seen)
+        self._seen.clear()
+        return failing
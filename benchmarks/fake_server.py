@@ -0,0 +1,226 @@
+"""Локальная замена API Практикума для нагрузочных прогонов.
+
+Отдает ``/api/user_api/homework_statuses/`` с семантикой ``from_date``:
+в ответ попадают работы, статус которых менялся не раньше ``from_date``.
+Для каждого токена статусы меняются по сценарию: из JSON-файла
+``--script`` или по умолчанию случайно, но воспроизводимо от токена.
+Задержка, доля ответов 5xx и битого JSON и предельная частота запросов
+настраиваются.
+
+    python benchmarks/fake_server.py --port 8080 --latency 0.2
+
+Бот направляется на сервер переменной ``PRACTICUM_ENDPOINT``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PATH = "/api/user_api/homework_statuses/"
+TRANSITIONS = ("reviewing", "rejected", "reviewing", "approved")
+
+Event = Tuple[float, int, str, str]
+
+
+class Scenario:
+    """Сценарий смены статусов работ для каждого токена.
+
+    Время событий задается в секундах от запуска сервера.
+    """
+
+    def __init__(
+        self,
+        script: Optional[Dict[str, List[list]]] = None,
+        homeworks: int = 1,
+        period: float = 600,
+        started: Optional[float] = None,
+    ):
+        self.script = script or {}
+        self.homeworks = homeworks
+        self.period = period
+        self.started = time.time() if started is None else started
+        self._timelines: Dict[str, List[Event]] = {}
+        self._lock = threading.Lock()
+
+    def timeline(self, token: str) -> List[Event]:
+        """Метод получения отсортированных событий токена."""
+        with self._lock:
+            if token not in self._timelines:
+                self._timelines[token] = self._build(token)
+            return self._timelines[token]
+
+    def _build(self, token: str) -> List[Event]:
+        if token in self.script:
+            ids: Dict[str, int] = {}
+            return sorted(
+                (
+                    self.started + offset,
+                    ids.setdefault(name, len(ids)),
+                    name,
+                    status,
+                )
+                for offset, name, status in self.script[token]
+            )
+        rng = random.Random(token)
+        events = []
+        for index in range(self.homeworks):
+            moment = self.started + rng.uniform(0, self.period)
+            name = f"{token[:8]}__hw{index}.zip"
+            for status in TRANSITIONS:
+                events.append((moment, index, name, status))
+                moment += rng.uniform(self.period / 4, self.period)
+        return sorted(events)
+
+    def answer(self, token: str, from_date: int, now: float) -> dict:
+        """Метод построения ответа API на момент ``now``."""
+        latest: Dict[int, Event] = {}
+        for event in self.timeline(token):
+            if event[0] > now:
+                break
+            latest[event[1]] = event
+        homeworks = [
+            {
+                "id": index,
+                "status": status,
+                "homework_name": name,
+                "reviewer_comment": "",
+                "date_updated": datetime.fromtimestamp(
+                    moment, timezone.utc
+                ).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "lesson_name": "Нагрузочный прогон",
+            }
+            for moment, index, name, status in sorted(
+                latest.values(), reverse=True
+            )
+            if moment >= from_date
+        ]
+        return {"homeworks": homeworks, "current_date": int(now)}
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов статусов домашних работ."""
+
+    protocol_version = "HTTP/1.1"
+    server: "FakeApiServer"
+
+    def do_GET(self):
+        options = self.server.options
+        if options.latency:
+            time.sleep(
+                max(0.0, random.gauss(options.latency, options.jitter))
+            )
+        url = urlparse(self.path)
+        auth = self.headers.get("Authorization", "")
+        if url.path != PATH:
+            return self._reply(404, {"message": "Not found"})
+        if not auth.startswith("OAuth ") or not auth[6:]:
+            return self._reply(401, {"code": "not_authenticated"})
+        if not self.server.allow_request():
+            return self._reply(429, {"message": "Too many requests"})
+        if random.random() < options.error_rate:
+            return self._reply(503, {"message": "Service unavailable"})
+        try:
+            from_date = int(float(parse_qs(url.query)["from_date"][0]))
+        except (KeyError, ValueError):
+            return self._reply(400, {"code": "UnknownError"})
+        if random.random() < options.malformed_rate:
+            return self._send(200, b'{"homeworks": [{"id": ')
+        scenario = self.server.scenario
+        self._reply(200, scenario.answer(auth[6:], from_date, time.time()))
+
+    def _reply(self, status: int, payload: dict):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode())
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(status)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeApiServer(ThreadingHTTPServer):
+    """HTTP-сервер со сценарием и ограничением частоты запросов."""
+
+    daemon_threads = True
+
+    def __init__(self, address, scenario: Scenario, options):
+        super().__init__(address, FakeApiHandler)
+        self.scenario = scenario
+        self.options = options
+        self.statuses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._window = int(time.time())
+        self._window_requests = 0
+
+    def allow_request(self) -> bool:
+        """Метод проверки предельной частоты запросов в секунду."""
+        if not self.options.max_rps:
+            return True
+        with self._lock:
+            second = int(time.time())
+            if second != self._window:
+                self._window, self._window_requests = second, 0
+            self._window_requests += 1
+            return self._window_requests <= self.options.max_rps
+
+    def count(self, status: int):
+        """Метод учета кода ответа."""
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+
+def parse_args(argv=None):
+    """Метод разбора параметров командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--script", help="JSON: токен -> [[секунды, имя, статус], ...]"
+    )
+    parser.add_argument("--homeworks", type=int, default=1)
+    parser.add_argument("--period", type=float, default=600)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def make_server(options) -> FakeApiServer:
+    """Метод создания сервера по параметрам."""
+    script = None
+    if options.script:
+        with open(options.script, encoding="utf-8") as file:
+            script = json.load(file)
+    scenario = Scenario(script, options.homeworks, options.period)
+    return FakeApiServer((options.host, options.port), scenario, options)
+
+
+def main():
+    """Запуск сервера до прерывания."""
+    server = make_server(parse_args())
+    print(f"http://{server.server_address[0]}:{server.server_port}{PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Коды ответов: {server.statuses}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
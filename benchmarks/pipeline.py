@@ -0,0 +1,186 @@
+"""Бенчмарк конвейера опроса на заглушках из тестов.
+
+Прогоняет get_api_answer -> check_response -> validate_homeworks ->
+send_message для заданного числа подписчиков и работ в ответе и пишет
+пропускную способность, p50/p99 задержки цикла и пиковую память в JSON.
+
+    python benchmarks/pipeline.py --output bench.json
+    python benchmarks/pipeline.py --compare bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from os.path import abspath, dirname, join
+from typing import Dict, List
+
+root_dir = dirname(dirname(abspath(__file__)))
+sys.path.append(root_dir)
+sys.path.append(join(root_dir, "tests"))
+
+import requests  # noqa: E402
+
+import homework  # noqa: E402
+from test_bot import MockResponseGET, MockTelegramBot  # noqa: E402
+
+TENANTS = (1, 100, 10000)
+HOMEWORKS = (0, 1, 1000)
+STATUSES = tuple(homework.HOMEWORK_STATUSES)
+CURRENT_TIMESTAMP = 1000198000
+
+
+def make_body(homeworks: int) -> str:
+    """Метод построения тела ответа API с заданным числом работ."""
+    return json.dumps(
+        {
+            "homeworks": [
+                {
+                    "id": index,
+                    "status": STATUSES[index % len(STATUSES)],
+                    "homework_name": f"user__hw{index}.zip",
+                    "reviewer_comment": "Всё нравится",
+                    "date_updated": "2022-02-13T14:40:57Z",
+                    "lesson_name": "Итоговый проект",
+                }
+                for index in range(homeworks)
+            ],
+            "current_date": CURRENT_TIMESTAMP,
+        }
+    )
+
+
+def install_mocks(body: str):
+    """Метод подмены requests.get заглушкой с готовым телом ответа."""
+
+    def mock_response_get(*args, **kwargs):
+        response = MockResponseGET(
+            *args,
+            random_timestamp=CURRENT_TIMESTAMP,
+            current_timestamp=CURRENT_TIMESTAMP,
+            **kwargs,
+        )
+        response.json = lambda: json.loads(body)
+        return response
+
+    requests.get = mock_response_get
+    homework.PRACTICUM_TOKEN = "bench"
+    homework.TELEGRAM_CHAT_ID = 1
+
+
+def cycle(bot):
+    """Один цикл конвейера для одного подписчика."""
+    response = homework.get_api_answer(CURRENT_TIMESTAMP)
+    records, _ = homework.validate_homeworks(homework.check_response(response))
+    for record in records:
+        homework.send_message(bot, record.message)
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Метод получения перцентиля по отсортированному списку."""
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def run(tenants: int, homeworks: int) -> Dict[str, float]:
+    """Метод замера одного сценария."""
+    install_mocks(make_body(homeworks))
+    bot = MockTelegramBot(token="bench", random_timestamp=CURRENT_TIMESTAMP)
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(tenants):
+        cycle_started = time.perf_counter()
+        cycle(bot)
+        latencies.append(time.perf_counter() - cycle_started)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for _ in range(min(tenants, 100)):
+        cycle(bot)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "tenants": tenants,
+        "homeworks": homeworks,
+        "cycles_per_second": tenants / elapsed,
+        "homeworks_per_second": tenants * homeworks / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def revision() -> str:
+    """Метод получения текущего коммита для подписи результатов."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=root_dir,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: List[dict], baseline_path: str):
+    """Метод печати изменения пропускной способности к базовому прогону."""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {
+            (item["tenants"], item["homeworks"]): item
+            for item in json.load(file)["results"]
+        }
+    for item in results:
+        previous = baseline.get((item["tenants"], item["homeworks"]))
+        if previous is None:
+            continue
+        ratio = item["cycles_per_second"] / previous["cycles_per_second"]
+        print(
+            f"{item['tenants']:>6} x {item['homeworks']:>5}: "
+            f"{ratio:6.2f}x циклов/с, "
+            f"p99 {previous['p99_ms']:.3f} -> {item['p99_ms']:.3f} мс"
+        )
+
+
+def main():
+    """Запуск бенчмарка из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, nargs="+", default=TENANTS)
+    parser.add_argument(
+        "--homeworks", type=int, nargs="+", default=HOMEWORKS
+    )
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего прогона")
+    args = parser.parse_args()
+
+    homework.logger.disabled = True
+    results = []
+    for tenants in args.tenants:
+        for homeworks in args.homeworks:
+            result = run(tenants, homeworks)
+            results.append(result)
+            print(
+                f"{tenants:>6} x {homeworks:>5}: "
+                f"{result['cycles_per_second']:10.0f} циклов/с, "
+                f"p50 {result['p50_ms']:.3f} мс, "
+                f"p99 {result['p99_ms']:.3f} мс, "
+                f"память {result['peak_memory_kb']:.0f} КБ"
+            )
+    report = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Прогон опроса в виртуальном времени против сценария фейкового API.
+
+Подписчики опрашиваются настоящими ``homework.poll_tenant`` и
+``PollScheduler``, но часы виртуальные: неделя опроса тысяч подписчиков
+проходит за секунды. Печатает число запросов к API, пиковую нагрузку
+по часам, средний интервал опроса и число уведомлений.
+
+    python benchmarks/simulate.py --tenants 1000 --days 7
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from os.path import abspath, dirname, join
+
+root_dir = dirname(dirname(abspath(__file__)))
+sys.path.append(root_dir)
+sys.path.append(join(root_dir, "benchmarks"))
+
+import requests  # noqa: E402
+
+import homework  # noqa: E402
+from clock import VirtualClock, simulate  # noqa: E402
+from fake_server import PATH, Scenario  # noqa: E402
+from settings import DEFAULTS  # noqa: E402
+from status_store import StatusStore  # noqa: E402
+from tenants import make_tenant  # noqa: E402
+
+DAY = 24 * 60 * 60
+HOUR = 60 * 60
+START = 1600000000
+
+
+class VirtualResponse:
+    """Ответ API без сети."""
+
+    status_code = 200
+    headers: dict = {}
+
+    def __init__(self, answer: dict):
+        self.answer = answer
+
+    def json(self):
+        return self.answer
+
+
+class CountingBot:
+    """Бот, который только считает сообщения."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent += 1
+
+
+def install(scenario: Scenario, clock: VirtualClock, hours: Counter):
+    """Метод подмены requests.get ответами сценария в виртуальном времени.
+
+    Статусы хранятся в памяти: по ним планировщик опрашивает работы
+    на проверке чаще.
+    """
+
+    def virtual_get(url, headers=None, params=None, **kwargs):
+        now = clock.time()
+        hours[int((now - START) // HOUR)] += 1
+        token = headers["Authorization"][6:]
+        return VirtualResponse(
+            scenario.answer(token, int(params["from_date"]), now)
+        )
+
+    requests.get = virtual_get
+    homework.ENDPOINT = f"http://virtual{PATH}"
+    homework.clock = clock
+    homework.status_store = StatusStore(":memory:")
+
+
+def run(tenants: int, days: float, homeworks: int, period: float) -> dict:
+    """Метод одного прогона."""
+    clock = VirtualClock(START)
+    hours: Counter = Counter()
+    scenario = Scenario(homeworks=homeworks, period=period, started=START)
+    install(scenario, clock, hours)
+    bot = CountingBot()
+    subscribers = [
+        make_tenant(f"token-{index}", index, DEFAULTS)
+        for index in range(tenants)
+    ]
+    for tenant in subscribers:
+        homework.restore_cursor(tenant)
+    started = time.perf_counter()
+    result = simulate(
+        subscribers,
+        lambda tenant: homework.poll_tenant(bot, tenant),
+        days * DAY,
+        clock,
+        DEFAULTS.retry_time,
+    )
+    result.update(
+        {
+            "days": days,
+            "peak_calls_per_hour": max(hours.values(), default=0),
+            "messages": bot.sent,
+            "wall_seconds": time.perf_counter() - started,
+        }
+    )
+    return result
+
+
+def main():
+    """Запуск прогона из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=1000)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--homeworks", type=int, default=1)
+    parser.add_argument("--period", type=float, default=DAY)
+    args = parser.parse_args()
+
+    homework.logger.disabled = True
+    result = run(args.tenants, args.days, args.homeworks, args.period)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Замер холодного старта бота: импорт и время до первого опроса.
+
+Каждый замер идет в отдельном интерпретаторе, первый опрос уходит
+на локальный fake_server. При превышении бюджета код возврата 1.
+
+    python benchmarks/startup.py
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from dataclasses import fields
+from os.path import abspath, dirname
+from typing import Dict, Optional
+
+root_dir = dirname(dirname(abspath(__file__)))
+sys.path.append(root_dir)
+sys.path.append(dirname(abspath(__file__)))
+
+import fake_server  # noqa: E402
+from settings import Settings  # noqa: E402
+
+IMPORT_BUDGET = 0.25
+FIRST_POLL_BUDGET = 2.0
+HEAVY_MODULES = ("telegram", "requests", "dotenv", "sqlite3", "http.server")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import homework
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+FIRST_POLL_PROBE = """
+import json, time
+started = time.perf_counter()
+import homework
+bot, tenant = homework.startup()
+homework.poll_tenant(bot, tenant)
+print(json.dumps({"seconds": time.perf_counter() - started}))
+"""
+
+
+def run_probe(code: str, env: Optional[Dict[str, str]] = None) -> dict:
+    """Метод запуска замера в чистом интерпретаторе.
+
+    Настройки бота из окружения не передаются, чтобы замер
+    не зависел от них.
+    """
+    own = {field.name.upper() for field in fields(Settings)}
+    environ = {
+        key: value for key, value in os.environ.items() if key not in own
+    }
+    environ.update(env or {})
+    environ["PYTHONPATH"] = root_dir
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=workdir,
+            env=environ,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_import() -> dict:
+    """Метод замера импорта homework и списка загруженных тяжелых модулей."""
+    return run_probe(IMPORT_PROBE)
+
+
+def measure_first_poll() -> dict:
+    """Метод замера времени от импорта до конца первого опроса."""
+    options = fake_server.parse_args(["--port", "0"])
+    server = fake_server.make_server(options)
+    server.scenario.script = {"startup": []}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        return run_probe(
+            FIRST_POLL_PROBE,
+            {
+                "PRACTICUM_TOKEN": "startup",
+                "TELEGRAM_TOKEN": "1234:startup",
+                "TELEGRAM_CHAT_ID": "1",
+                "PRACTICUM_ENDPOINT": (
+                    f"http://127.0.0.1:{server.server_port}{fake_server.PATH}"
+                ),
+            },
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    """Запуск замеров с проверкой бюджета."""
+    imported = measure_import()
+    first_poll = measure_first_poll()
+    print(
+        f"Импорт homework: {imported['seconds'] * 1000:.1f} мс "
+        f"(бюджет {IMPORT_BUDGET * 1000:.0f} мс), "
+        f"тяжелые модули: {imported['heavy'] or 'нет'}"
+    )
+    print(
+        f"До первого опроса: {first_poll['seconds'] * 1000:.1f} мс "
+        f"(бюджет {FIRST_POLL_BUDGET * 1000:.0f} мс)"
+    )
+    if (
+        imported["seconds"] > IMPORT_BUDGET
+        or imported["heavy"]
+        or first_poll["seconds"] > FIRST_POLL_BUDGET
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Предохранитель запросов к API, общий для всех подписчиков хоста."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Tuple
+from urllib.parse import urlsplit
+
+from exceptions import CircuitOpenError
+from settings import DEFAULTS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Предохранитель с состояниями closed, open и half-open.
+
+    После ``failures`` сбоев подряд запросы перестают отправляться
+    на ``reset`` секунд. Затем пропускается не больше ``probes``
+    пробных запросов: успех замыкает цепь, сбой снова размыкает ее.
+    Пробы, не вернувшие результата за ``reset`` секунд, не учитываются.
+    """
+
+    def __init__(
+        self,
+        failures: int = DEFAULTS.circuit_failures,
+        reset: float = DEFAULTS.circuit_reset,
+        probes: int = DEFAULTS.circuit_probes,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failures = failures
+        self.reset = reset
+        self.probes = probes
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self.in_flight = 0
+        self.trips = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def before(self):
+        """Метод проверки перед запросом; при разомкнутой цепи исключение."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = self.clock()
+            waited = now - self.opened_at
+            if waited >= self.reset:
+                self.state = HALF_OPEN
+                self.opened_at = now
+                self.in_flight = 0
+                waited = 0
+            if self.state == HALF_OPEN and self.in_flight < self.probes:
+                self.in_flight += 1
+                return
+            self.rejected += 1
+            raise CircuitOpenError(
+                "API временно недоступен, опрос приостановлен",
+                max(self.reset - waited, 0),
+            )
+
+    def success(self):
+        """Метод учета успешного ответа."""
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Доступ к API восстановлен")
+            self.state = CLOSED
+            self.consecutive = 0
+            self.in_flight = 0
+
+    def failure(self):
+        """Метод учета сбоя запроса."""
+        with self._lock:
+            self.consecutive += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive >= self.failures
+            ):
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self.in_flight = 0
+                self.trips += 1
+                logger.warning(
+                    f"API недоступен после {self.consecutive} сбоев, "
+                    f"опрос приостановлен на {self.reset} с"
+                )
+
+    def stats(self) -> Dict[str, float]:
+        """Метод получения состояния и счетчиков."""
+        return {
+            "state": STATES[self.state],
+            "consecutive_failures": self.consecutive,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitRegistry:
+    """Предохранители по хостам: один на хост для всех подписчиков."""
+
+    def __init__(
+        self,
+        failures: int = DEFAULTS.circuit_failures,
+        reset: float = DEFAULTS.circuit_reset,
+        probes: int = DEFAULTS.circuit_probes,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failures = failures
+        self.reset = reset
+        self.probes = probes
+        self.clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, failures: int, reset: float, probes: int):
+        """Метод смены порогов у новых и уже созданных предохранителей."""
+        with self._lock:
+            self.failures, self.reset, self.probes = failures, reset, probes
+            for breaker in self._breakers.values():
+                breaker.failures = failures
+                breaker.reset = reset
+                breaker.probes = probes
+
+    def get(self, url: str) -> CircuitBreaker:
+        """Метод получения предохранителя хоста из адреса."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    self.failures, self.reset, self.probes, self.clock
+                )
+            return breaker
+
+    def collect(self) -> Dict[Tuple[Tuple[str, str], ...], float]:
+        """Метод сбора показателей всех предохранителей для метрик."""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {
+            (("host", host), ("stat", key)): value
+            for host, breaker in breakers
+            for key, value in breaker.stats().items()
+        }
@@ -0,0 +1,124 @@
+"""Часы и планировщик опроса: настоящее и виртуальное время."""
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+class SystemClock:
+    """Настоящее время процесса."""
+
+    def time(self) -> float:
+        """Метод получения текущего времени UNIX."""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Метод получения монотонного времени для интервалов."""
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        """Метод ожидания."""
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Виртуальное время: ``sleep`` не ждет, а сдвигает часы.
+
+    Монотонное время совпадает с временем UNIX, поэтому интервалы
+    и отметки времени считаются по одним часам.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.slept = 0.0
+
+    def time(self) -> float:
+        """Метод получения текущего виртуального времени."""
+        return self.now
+
+    def monotonic(self) -> float:
+        """Метод получения монотонного времени для интервалов."""
+        return self.now
+
+    def sleep(self, seconds: float):
+        """Метод мгновенного ожидания со сдвигом часов."""
+        self.slept += max(seconds, 0)
+        self.advance(seconds)
+
+    def advance(self, seconds: float):
+        """Метод сдвига часов вперед."""
+        self.now += max(seconds, 0)
+
+
+class Scheduler:
+    """Очередь отложенных вызовов в виртуальном времени.
+
+    ``run`` выполняет вызовы в порядке срока, каждый раз переводя часы
+    на срок вызова, поэтому недели опроса проходят за время счета.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.calls = 0
+        self._queue: List[Tuple[float, int, Callable, tuple]] = []
+        self._sequence = itertools.count()
+
+    def call_at(self, when: float, func: Callable, *args):
+        """Метод вызова ``func`` в момент ``when``."""
+        heapq.heappush(self._queue, (when, next(self._sequence), func, args))
+
+    def call_later(self, delay: float, func: Callable, *args):
+        """Метод вызова ``func`` через ``delay`` секунд."""
+        self.call_at(self.clock.time() + max(delay, 0), func, *args)
+
+    def run(self, until: float) -> int:
+        """Метод выполнения вызовов со сроком до ``until``."""
+        calls = 0
+        while self._queue and self._queue[0][0] <= until:
+            when, _, func, args = heapq.heappop(self._queue)
+            self.clock.advance(when - self.clock.time())
+            func(*args)
+            calls += 1
+        self.clock.advance(until - self.clock.time())
+        self.calls += calls
+        return calls
+
+
+def simulate(
+    tenants: Iterable,
+    poll: Callable[[object], float],
+    duration: float,
+    clock: VirtualClock,
+    spread: float = 0,
+) -> Dict[str, float]:
+    """Метод прогона опроса подписчиков в виртуальном времени.
+
+    Как и ``engine.PollingEngine``, старты подписчиков распределены
+    по ``spread`` секундам, а после каждого опроса ``poll(tenant)``
+    следующий назначается через возвращенную задержку.
+    """
+    tenants = list(tenants)
+    scheduler = Scheduler(clock)
+    delays: List[float] = []
+
+    def tick(tenant):
+        delay = poll(tenant)
+        delays.append(delay)
+        scheduler.call_later(delay, tick, tenant)
+
+    step = spread / max(len(tenants), 1)
+    started = clock.time()
+    for index, tenant in enumerate(tenants):
+        scheduler.call_at(started + index * step, tick, tenant)
+    polls = scheduler.run(started + duration)
+    days = duration / (24 * 60 * 60)
+    return {
+        "tenants": len(tenants),
+        "polls": polls,
+        "polls_per_tenant_day": (
+            polls / len(tenants) / days if tenants and days else 0.0
+        ),
+        "average_delay": sum(delays) / len(delays) if delays else 0.0,
+    }
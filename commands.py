@@ -0,0 +1,170 @@
+"""Команды бота /status и /history из кэша последних ответов API."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from settings import DEFAULTS
+from status_store import homework_key
+
+NO_DATA = (
+    "Данных о работах пока нет: они появятся после первого "
+    "изменения статуса."
+)
+
+Record = Tuple[str, str, str]
+
+
+class _Entry:
+    """Последние статусы и история изменений одного чата."""
+
+    __slots__ = ("updated", "homeworks", "history")
+
+    def __init__(self, history_length: int):
+        self.updated = 0.0
+        self.homeworks: Dict[str, Record] = {}
+        self.history: Deque[Record] = deque(maxlen=history_length)
+
+
+class StatusCache:
+    """Ограниченный по размеру и времени жизни кэш ответов по чатам.
+
+    Заполняется записями из ответа API в цикле опроса,
+    а команды читают только его и никогда не обращаются к API.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULTS.command_cache_size,
+        ttl: float = DEFAULTS.command_cache_ttl,
+        history_length: int = DEFAULTS.command_history_length,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.size = size
+        self.ttl = ttl
+        self.history_length = history_length
+        self.clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, chat_id, homeworks: List, now=None):
+        """Метод учета работ из ответа API: словарей или записей."""
+        now = self.clock() if now is None else now
+        chat_id = str(chat_id)
+        with self._lock:
+            entry = self._entries.pop(chat_id, None)
+            if entry is None:
+                entry = _Entry(self.history_length)
+            entry.updated = now
+            for homework in homeworks:
+                if isinstance(homework, dict):
+                    key = homework_key(homework)
+                    record = (
+                        homework["homework_name"],
+                        homework["status"],
+                        homework.get("date_updated") or "",
+                    )
+                else:
+                    key = homework.key
+                    record = (
+                        homework.name,
+                        homework.status,
+                        homework.date_updated,
+                    )
+                if entry.homeworks.get(key) != record:
+                    entry.homeworks[key] = record
+                    entry.history.append(record)
+            self._entries[chat_id] = entry
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def get(self, chat_id, now=None) -> Optional[_Entry]:
+        """Метод получения записи чата, если она не устарела."""
+        now = self.clock() if now is None else now
+        chat_id = str(chat_id)
+        with self._lock:
+            entry = self._entries.get(chat_id)
+            if entry is None:
+                return None
+            if now - entry.updated > self.ttl:
+                del self._entries[chat_id]
+                return None
+            return entry
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def render_status(
+    entry: Optional[_Entry],
+    verdicts: Dict[str, str],
+    now: Optional[float] = None,
+) -> str:
+    """Метод текста ответа на /status."""
+    if entry is None or not entry.homeworks:
+        return NO_DATA
+    lines = [
+        f'"{name}": {verdicts.get(status, status)}'
+        for name, status, _ in sorted(
+            entry.homeworks.values(), key=lambda record: record[2]
+        )
+    ]
+    now = time.time() if now is None else now
+    age = int((now - entry.updated) // 60)
+    lines.append(f"Проверено {age} мин назад.")
+    return "\n".join(lines)
+
+
+def render_history(entry: Optional[_Entry]) -> str:
+    """Метод текста ответа на /history."""
+    if entry is None or not entry.history:
+        return NO_DATA
+    return "\n".join(
+        f"{date or '—'} {name}: {status}"
+        for name, status, date in entry.history
+    )
+
+
+class CommandListener:
+    """Обработчик команд Telegram поверх ``telegram.ext.Updater``.
+
+    Ответы идут через ``reply``, то есть через ту же очередь отправки,
+    что и уведомления, и подчиняются ее ограничениям частоты.
+    """
+
+    def __init__(self, bot, cache: StatusCache, reply, verdicts):
+        self.bot = bot
+        self.cache = cache
+        self.reply = reply
+        self.verdicts = verdicts
+        self.updater = None
+
+    def status(self, update, context):
+        """Обработчик /status."""
+        chat_id = update.effective_chat.id
+        now = self.cache.clock()
+        entry = self.cache.get(chat_id, now)
+        self.reply(chat_id, render_status(entry, self.verdicts, now))
+
+    def history(self, update, context):
+        """Обработчик /history."""
+        chat_id = update.effective_chat.id
+        self.reply(chat_id, render_history(self.cache.get(chat_id)))
+
+    def start(self):
+        """Метод запуска получения обновлений в фоновом потоке."""
+        from telegram.ext import CommandHandler, Updater
+
+        self.updater = Updater(bot=self.bot, use_context=True)
+        dispatcher = self.updater.dispatcher
+        dispatcher.add_handler(CommandHandler("status", self.status))
+        dispatcher.add_handler(CommandHandler("history", self.history))
+        self.updater.start_polling(drop_pending_updates=True)
+        return self
+
+    def stop(self):
+        """Метод остановки получения обновлений."""
+        if self.updater is not None:
+            self.updater.stop()
@@ -0,0 +1,181 @@
+"""Файлы настроек и подписчиков, перечитываемые без перезапуска."""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import fields, replace
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from settings import CONVERTERS, Settings
+from tenants import Tenant, load_tenants
+
+# Применяются только после перезапуска.
+STATIC_FIELDS = (
+    "telegram_token",
+    "engine_concurrency",
+    "http_pool_size",
+    "status_db",
+    "status_cache_size",
+    "cursor_journal",
+    "cursor_journal_shared",
+    "outbox_db",
+    "history_db",
+    "history_queue_size",
+    "metrics_port",
+    "telegram_commands",
+    "command_history_length",
+    "response_cache",
+    "response_cache_db",
+    "log_format",
+    "log_queue_size",
+    "config_file",
+    "incremental",
+    "trace_file",
+    "profile_every",
+    "profile_dir",
+    "profile_keep",
+    "workers",
+    "shard_index",
+    "shard_count",
+    "pipeline_queue_size",
+    "pipeline_validate_workers",
+    "pipeline_diff_workers",
+    "pipeline_notify_workers",
+)
+# Применяются при перечитывании: homework.configure, update_tenant
+# и PollingEngine.reload.
+RELOADED_FIELDS = (
+    "practicum_token",
+    "telegram_chat_id",
+    "practicum_endpoint",
+    "retry_time",
+    "tenants_file",
+    "http_timeout",
+    "stream_threshold",
+    "stream_max_records",
+    "alert_window",
+    "alert_max_window",
+    "poll_floor",
+    "poll_ceiling",
+    "poll_idle",
+    "poll_reviewing",
+    "telegram_global_rate",
+    "telegram_chat_rate",
+    "journal_compact_every",
+    "command_cache_size",
+    "command_cache_ttl",
+    "response_cache_ttl",
+    "response_cache_size",
+    "circuit_failures",
+    "circuit_reset",
+    "circuit_probes",
+    "log_level",
+    "log_sample_every",
+    "outbox_retention",
+    "outbox_max_attempts",
+    "outbox_retry",
+    "outbox_retry_max",
+    "config_watch_interval",
+    "history_batch_size",
+    "history_flush_interval",
+)
+
+Snapshot = Tuple[Settings, Dict[str, str], List[Tenant]]
+
+
+def apply_overrides(base: Settings, overrides: Mapping[str, object]):
+    """Метод наложения значений из файла на настройки окружения."""
+    known = {field.name: field for field in fields(Settings)}
+    values = {}
+    for name, value in overrides.items():
+        if name not in known:
+            raise ValueError(f"Неизвестная настройка {name}")
+        if value is None:
+            values[name] = None
+            continue
+        values[name] = CONVERTERS.get(known[name].type, str)(str(value))
+    return replace(base, **values)
+
+
+class ConfigSource:
+    """Настройки из окружения, файла ``config_file`` и ``tenants_file``.
+
+    Файл настроек — JSON-объект с полями ``Settings`` и необязательным
+    ``homework_statuses`` с текстами вердиктов. ``transform``
+    и ``select`` позволяют процессу супервизора применить свои
+    настройки и взять только свою долю подписчиков.
+    """
+
+    def __init__(
+        self,
+        base: Settings,
+        verdicts: Mapping[str, str],
+        transform: Optional[Callable[[Settings], Settings]] = None,
+        select: Optional[Callable[[List[Tenant]], List[Tenant]]] = None,
+    ):
+        self.base = base
+        self.verdicts = dict(verdicts)
+        self.transform = transform
+        self.select = select
+        self._stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    def paths(self, settings: Settings) -> List[str]:
+        """Метод получения отслеживаемых файлов."""
+        return [
+            path
+            for path in (self.base.config_file, settings.tenants_file)
+            if path
+        ]
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self, settings: Settings) -> bool:
+        """Метод проверки, менялись ли файлы с последней загрузки."""
+        return any(
+            self._stamp(path) != self._stamps.get(path)
+            for path in self.paths(settings)
+        )
+
+    def load(self) -> Snapshot:
+        """Метод чтения настроек, вердиктов и подписчиков.
+
+        Ошибка в файле поднимает исключение, и ничего не применяется.
+        """
+        overrides: Dict[str, object] = {}
+        path = self.base.config_file
+        stamps = {path: self._stamp(path)} if path else {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                overrides = json.load(file)
+            if not isinstance(overrides, dict):
+                raise ValueError(f"{path}: ожидается JSON-объект")
+        verdicts = dict(self.verdicts)
+        texts = overrides.pop("homework_statuses", None) or {}
+        if not isinstance(texts, dict):
+            raise ValueError(f"{path}: homework_statuses не объект")
+        verdicts.update({str(key): str(text) for key, text in texts.items()})
+        settings = apply_overrides(self.base, overrides)
+        if self.transform is not None:
+            settings = self.transform(settings)
+        if settings.tenants_file:
+            stamps[settings.tenants_file] = self._stamp(settings.tenants_file)
+        tenants = load_tenants(settings)
+        if self.select is not None:
+            tenants = self.select(tenants)
+        self._stamps = stamps
+        return settings, verdicts, tenants
+
+
+def static_changes(old: Settings, new: Settings) -> List[str]:
+    """Метод поиска измененных настроек, требующих перезапуска."""
+    return [
+        name
+        for name in STATIC_FIELDS
+        if getattr(old, name) != getattr(new, name)
+    ]
@@ -0,0 +1,290 @@
+"""Очередь исходящих сообщений Telegram с ограничением частоты."""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from exceptions import MessageError
+from settings import DEFAULTS
+
+MESSAGE_LIMIT = 4096
+BUCKETS_LIMIT = 10000
+COMPACT_INTERVAL = 60 * 60
+
+Line = Tuple[str, float, Optional[int], int]
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Ведро токенов: ``rate`` событий в секунду, запас ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def wait(self, now: float) -> float:
+        """Метод расчета ожидания до появления токена."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Метод списания токена."""
+        self.tokens -= 1
+
+    @property
+    def full(self) -> bool:
+        """Ведро полное, и его можно забыть."""
+        return self.tokens >= self.capacity
+
+
+class DeliveryQueue:
+    """Неблокирующая очередь сообщений с отправкой в фоновом потоке.
+
+    Частота отправки ограничена общим ведром токенов и ведром
+    на каждый чат. Строки, накопившиеся для одного чата, пока он ждал
+    своей очереди, склеиваются в одно сообщение.
+
+    С ``outbox`` каждое сообщение сначала записывается в базу,
+    неотправленные сообщения переживают перезапуск, а неудачные
+    отправки повторяются с нарастающей паузой до ``max_attempts`` раз.
+    Без него сообщение, которое не удалось отправить, теряется.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, str], None],
+        global_rate: float = DEFAULTS.telegram_global_rate,
+        chat_rate: float = DEFAULTS.telegram_chat_rate,
+        outbox=None,
+        max_attempts: int = DEFAULTS.outbox_max_attempts,
+        retry: float = DEFAULTS.outbox_retry,
+        retry_max: float = DEFAULTS.outbox_retry_max,
+    ):
+        self.send = send
+        self.chat_rate = chat_rate
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self.outbox = outbox
+        self.max_attempts = max_attempts
+        self.retry = retry
+        self.retry_max = retry_max
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._pending: OrderedDict[str, List[Line]] = OrderedDict()
+        self._retries: List[Tuple[float, int, str, List[Line]]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._compacted = time.monotonic()
+        self.sent = 0
+        self.merged = 0
+        self.failed = 0
+        self.retried = 0
+        self.abandoned = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        if outbox is not None:
+            now = time.monotonic()
+            for ident, chat_id, text, attempts in outbox.pending():
+                self._pending.setdefault(chat_id, []).append(
+                    (text, now, ident, attempts)
+                )
+
+    def start(self):
+        """Метод запуска фонового потока отправки."""
+        self._thread = threading.Thread(
+            target=self._run, name="delivery", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def put(self, chat_id, text: str, key: Optional[str] = None):
+        """Метод постановки сообщения в очередь без ожидания.
+
+        Сообщение с уже известным ``key`` повторно не ставится.
+        """
+        ident = None
+        if self.outbox is not None:
+            ident = self.outbox.add(chat_id, text, key)
+            if ident is None:
+                return
+        with self._condition:
+            self._pending.setdefault(str(chat_id), []).append(
+                (text, time.monotonic(), ident, 0)
+            )
+            self._condition.notify()
+
+    def set_rates(self, global_rate: float, chat_rate: float):
+        """Метод смены ограничений частоты отправки на ходу."""
+        with self._condition:
+            self.chat_rate = chat_rate
+            self.global_bucket.rate = global_rate
+            self.global_bucket.capacity = global_rate
+            for bucket in self._buckets.values():
+                bucket.rate = chat_rate
+            self._condition.notify()
+
+    def depth(self) -> int:
+        """Число строк, ожидающих отправки."""
+        with self._condition:
+            return sum(len(lines) for lines in self._pending.values())
+
+    def stats(self) -> Dict[str, float]:
+        """Метод получения счетчиков очереди."""
+        with self._condition:
+            retrying = sum(len(lines) for *_, lines in self._retries)
+        return {
+            "depth": self.depth(),
+            "retrying": retrying,
+            "sent": self.sent,
+            "merged": self.merged,
+            "failed": self.failed,
+            "retried": self.retried,
+            "abandoned": self.abandoned,
+            "average_latency": (
+                self.total_latency / self.sent if self.sent else 0.0
+            ),
+            "max_latency": self.max_latency,
+            "alive": int(
+                self._thread is not None and self._thread.is_alive()
+            ),
+        }
+
+    def close(self, timeout: float = 10):
+        """Метод остановки потока после отправки очереди."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed and not self._pending:
+                        return
+                    now = time.monotonic()
+                    self._requeue(now)
+                    chat_id, wait = self._next_chat(now)
+                    if chat_id is not None:
+                        lines = self._take_lines(chat_id)
+                        break
+                    if self._retries:
+                        due = self._retries[0][0] - now
+                        wait = due if wait is None else min(wait, due)
+                    self._condition.wait(wait)
+            try:
+                self._deliver(chat_id, lines)
+            except Exception:
+                logger.exception(f"Сбой отправки в чат {chat_id}")
+                self._recover(chat_id, lines)
+
+    def _recover(self, chat_id: str, lines: List[Line]):
+        self.failed += 1
+        try:
+            self._retry(chat_id, lines)
+        except Exception:
+            logger.exception(f"Сообщения в чат {chat_id} не отложены")
+
+    def _requeue(self, now: float):
+        while self._retries and self._retries[0][0] <= now:
+            _, _, chat_id, lines = heapq.heappop(self._retries)
+            self._pending[chat_id] = lines + self._pending.get(chat_id, [])
+
+    def _next_chat(self, now: float) -> Tuple[Optional[str], Optional[float]]:
+        wait = None
+        for chat_id in self._pending:
+            bucket = self._buckets.get(chat_id)
+            if bucket is None:
+                bucket = self._buckets[chat_id] = TokenBucket(self.chat_rate)
+            chat_wait = bucket.wait(now)
+            if chat_wait == 0:
+                global_wait = self.global_bucket.wait(now)
+                if global_wait:
+                    return None, global_wait
+                bucket.take()
+                self.global_bucket.take()
+                return chat_id, 0.0
+            wait = chat_wait if wait is None else min(wait, chat_wait)
+        return None, wait
+
+    def _take_lines(self, chat_id: str) -> List[Line]:
+        pending = self._pending[chat_id]
+        lines, size = [], 0
+        while pending and (
+            not lines or size + len(pending[0][0]) + 2 <= MESSAGE_LIMIT
+        ):
+            line = pending.pop(0)
+            size += len(line[0]) + 2
+            lines.append(line)
+        if not pending:
+            del self._pending[chat_id]
+        if len(self._buckets) > BUCKETS_LIMIT:
+            now = time.monotonic()
+            for key in list(self._buckets):
+                if key not in self._pending and (
+                    self._buckets[key].wait(now) == 0
+                    and self._buckets[key].full
+                ):
+                    del self._buckets[key]
+        return lines
+
+    def _deliver(self, chat_id: str, lines: List[Line]):
+        try:
+            self.send(chat_id, "\n\n".join(line[0] for line in lines))
+        except MessageError as error:
+            self.failed += 1
+            logger.error(f"Сообщение в чат {chat_id} не отправлено: {error}")
+            self._retry(chat_id, lines)
+            return
+        latency = time.monotonic() - lines[0][1]
+        self.sent += 1
+        self.merged += len(lines) - 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        if self.outbox is not None:
+            self.outbox.delivered(line[2] for line in lines)
+            if time.monotonic() - self._compacted > COMPACT_INTERVAL:
+                self._compacted = time.monotonic()
+                self.outbox.compact()
+
+    def _retry(self, chat_id: str, lines: List[Line]):
+        if self.outbox is None:
+            return
+        self.outbox.failed(line[2] for line in lines)
+        lines = [
+            (text, enqueued, ident, attempts + 1)
+            for text, enqueued, ident, attempts in lines
+        ]
+        alive = [line for line in lines if line[3] < self.max_attempts]
+        dead = [line[2] for line in lines if line[3] >= self.max_attempts]
+        if dead:
+            self.outbox.abandon(dead)
+            self.abandoned += len(dead)
+            logger.error(
+                f"Сообщения в чат {chat_id} брошены после "
+                f"{self.max_attempts} попыток: {len(dead)}"
+            )
+        if not alive:
+            return
+        attempts = max(line[3] for line in alive)
+        delay = min(self.retry * 2 ** (attempts - 1), self.retry_max)
+        due = time.monotonic() + delay
+        with self._condition:
+            heapq.heappush(
+                self._retries, (due, next(self._sequence), chat_id, alive)
+            )
+            self.retried += len(alive)
@@ -0,0 +1,255 @@
+"""Асинхронный опрос API для множества подписчиков в одном процессе."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import homework
+import logs
+import metrics
+from config import ConfigSource, static_changes
+from exceptions import VariablesError
+from pipeline import Pipeline, stage_workers
+from settings import DEFAULTS, Settings, load_settings
+from tenants import Tenant, update_tenant
+
+logger = logging.getLogger(__name__)
+
+
+class PollingEngine:
+    """Цикл событий, опрашивающий всех подписчиков процесса.
+
+    Каждый подписчик хранит свой курсор ``current_timestamp`` и чат,
+    а одновременно выполняется не больше ``concurrency`` запросов.
+    Опрос проходит этапы ``pipeline.Pipeline`` с числом исполнителей
+    ``workers`` и очередями на ``queue_size`` заданий между ними;
+    блокирующие этапы выполняются в пуле потоков, поэтому цикл событий
+    не ждет сети.
+
+    Если задан ``source``, настройки и подписчики перечитываются
+    по SIGHUP или при изменении файлов: новые подписчики добавляются,
+    удаленные останавливаются, остальные продолжают опрос.
+    """
+
+    def __init__(
+        self,
+        bot,
+        tenants: Iterable[Tenant],
+        concurrency: int = DEFAULTS.engine_concurrency,
+        retry_time: int = DEFAULTS.retry_time,
+        source: Optional[ConfigSource] = None,
+        watch_interval: float = DEFAULTS.config_watch_interval,
+        workers: Optional[Dict[str, int]] = None,
+        queue_size: int = DEFAULTS.pipeline_queue_size,
+    ):
+        self.bot = bot
+        self.tenants = list(
+            {tenant.subscriber: tenant for tenant in tenants}.values()
+        )
+        self.concurrency = concurrency
+        self.retry_time = retry_time
+        self.source = source
+        self.watch_interval = watch_interval
+        workers = workers or dict(stage_workers(), fetch=concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=sum(workers.values()), thread_name_prefix="poll"
+        )
+        self.pipeline = Pipeline(bot, self._executor, workers, queue_size)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def poll(self, tenant: Tenant):
+        """Метод одного опроса подписчика через конвейер.
+
+        Возвращает задержку до следующего опроса этого подписчика.
+        """
+        return await self.pipeline.submit(tenant)
+
+    async def run_tenant(self, tenant: Tenant, offset: float = 0):
+        """Метод бесконечного опроса одного подписчика."""
+        await asyncio.sleep(offset)
+        while True:
+            delay = self.retry_time
+            try:
+                delay = await self.poll(tenant)
+            except Exception as error:
+                logger.error(f"Сбой опроса {tenant.subscriber}: {error}")
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await asyncio.sleep(delay)
+            if metrics.enabled:
+                lag = loop.time() - started - delay
+                metrics.observe("loop_lag_seconds", lag)
+
+    async def report(self):
+        """Метод периодического журналирования счетчиков опроса."""
+        while True:
+            await asyncio.sleep(self.retry_time)
+            if homework.api_client is not None:
+                logger.info(f"HTTP: {homework.api_client.stats()}")
+            if homework.response_cache is not None:
+                logger.info(f"Кэш ответов: {homework.response_cache.stats()}")
+            if homework.fingerprints is not None:
+                logger.info(f"Отпечатки: {homework.fingerprints.stats()}")
+            if homework.delivery_queue is not None:
+                logger.info(
+                    f"Отправка: {homework.delivery_queue.stats()}"
+                )
+            if self.pipeline.stages:
+                logger.info(f"Конвейер: {self.pipeline.stats()}")
+            if self.tenants:
+                average = sum(
+                    tenant.schedule.average_delay for tenant in self.tenants
+                ) / len(self.tenants)
+                logger.info(f"Средний интервал опроса: {average:.0f} с")
+
+    def add(self, tenant: Tenant, offset: float = 0):
+        """Метод запуска опроса нового подписчика."""
+        previous = self._tasks.get(tenant.subscriber)
+        if previous is not None:
+            previous.cancel()
+        self.tenants = [
+            other
+            for other in self.tenants
+            if other.subscriber != tenant.subscriber
+        ] + [tenant]
+        self._tasks[tenant.subscriber] = asyncio.create_task(
+            self.run_tenant(tenant, offset)
+        )
+
+    def remove(self, key: str):
+        """Метод остановки опроса подписчика."""
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+        if homework.fingerprints is not None:
+            homework.fingerprints.forget(key)
+        self.tenants = [
+            tenant for tenant in self.tenants if tenant.subscriber != key
+        ]
+
+    def apply(self, settings: Settings, tenants: List[Tenant]):
+        """Метод применения нового списка подписчиков.
+
+        Подписчики сравниваются по токену и чату: у оставшихся
+        обновляются интервалы, курсор и задача опроса сохраняются.
+        """
+        current = {tenant.subscriber: tenant for tenant in self.tenants}
+        fresh = {tenant.subscriber: tenant for tenant in tenants}
+        for key in current.keys() - fresh.keys():
+            self.remove(key)
+        added = [tenant for key, tenant in fresh.items() if key not in current]
+        for key in current.keys() & fresh.keys():
+            update_tenant(current[key], fresh[key].chat_id, settings)
+        step = self.retry_time / max(len(added), 1)
+        for index, tenant in enumerate(added):
+            homework.restore_cursor(tenant)
+            self.add(tenant, index * step)
+        if added or current.keys() - fresh.keys():
+            logger.info(
+                f"Подписчиков: {len(self.tenants)}, добавлено {len(added)}, "
+                f"удалено {len(current.keys() - fresh.keys())}"
+            )
+
+    def reload(self):
+        """Метод перечитывания настроек; при ошибке остаются старые."""
+        try:
+            settings, verdicts, tenants = self.source.load()
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logger.error(f"Настройки не перечитаны: {error}")
+            return
+        changed = static_changes(homework.settings, settings)
+        if changed:
+            logger.warning(
+                f"Настройки {', '.join(changed)} применятся после перезапуска"
+            )
+        homework.configure(settings, verdicts)
+        logs.reconfigure(settings)
+        self.retry_time = settings.retry_time
+        self.watch_interval = settings.config_watch_interval
+        self.apply(settings, tenants)
+        logger.info("Настройки перечитаны")
+
+    async def watch(self):
+        """Метод ожидания SIGHUP или изменения файлов настроек."""
+        if self.source is None:
+            return
+        requested = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        if hasattr(signal, "SIGHUP"):
+            loop.add_signal_handler(signal.SIGHUP, requested.set)
+        while True:
+            try:
+                await asyncio.wait_for(requested.wait(), self.watch_interval)
+            except asyncio.TimeoutError:
+                if not self.source.changed(homework.settings):
+                    continue
+            requested.clear()
+            self.reload()
+
+    async def run(self):
+        """Метод запуска опроса всех подписчиков.
+
+        Старты подписчиков равномерно распределены по ``retry_time``,
+        чтобы запросы к API не приходили одной пачкой.
+        """
+        step = self.retry_time / max(len(self.tenants), 1)
+        self.pipeline.start()
+        metrics.registry.gauge("pipeline", self.pipeline.collect)
+        try:
+            for index, tenant in enumerate(list(self.tenants)):
+                self._tasks[tenant.subscriber] = asyncio.create_task(
+                    self.run_tenant(tenant, index * step)
+                )
+            await asyncio.gather(self.report(), self.watch())
+        finally:
+            for task in self._tasks.values():
+                task.cancel()
+            self.pipeline.stop()
+            self._executor.shutdown(wait=False)
+
+
+def serve(source: ConfigSource, allow_empty: bool = False):
+    """Метод запуска служб и движка с перечитываемыми настройками."""
+    settings, verdicts, tenants = source.load()
+    homework.configure(settings, verdicts)
+    if not settings.telegram_token or not (tenants or allow_empty):
+        logging.critical("Ошибка в переменных окружения")
+        raise VariablesError("Проверьте значение токенов")
+    import telegram
+    from telegram.utils.request import Request
+
+    bot = telegram.Bot(
+        token=settings.telegram_token,
+        request=Request(con_pool_size=settings.engine_concurrency),
+    )
+    homework.start_services(bot, settings.http_pool_size)
+    homework.start_commands(bot)
+    for tenant in tenants:
+        homework.restore_cursor(tenant)
+    logger.info(f"Опрос {len(tenants)} подписчиков")
+    asyncio.run(
+        PollingEngine(
+            bot,
+            tenants,
+            settings.engine_concurrency,
+            settings.retry_time,
+            source,
+            settings.config_watch_interval,
+            stage_workers(settings),
+            settings.pipeline_queue_size,
+        ).run()
+    )
+
+
+def main():
+    """Запуск движка для подписчиков из файла или окружения."""
+    settings = load_settings()
+    homework.setup_logging(settings)
+    serve(ConfigSource(settings, homework.HOMEWORK_STATUSES))
+
+
+if __name__ == "__main__":
+    main()
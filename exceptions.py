@@ -18,3 +18,19 @@ class StatusCodeError(Exception):
     """Исключение при неверном статусе дз."""
 
     pass
+
+
+class CircuitOpenError(Exception):
+    """Запрос не отправлен: API временно считается недоступным."""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class HomeworksError(ValueError):
+    """В ответе API есть работы, которые нельзя разобрать."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
@@ -0,0 +1,177 @@
+"""Отпечатки ответов API и работ для пропуска неизменившихся данных."""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+CURRENT_DATE = re.compile(rb'"current_date"\s*:\s*(-?\d+)')
+COUNTERS = ("responses", "skipped_responses", "records", "skipped_records")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def body_fingerprint(body: bytes) -> Tuple[str, Optional[int]]:
+    """Метод получения отпечатка тела ответа и ``current_date`` из него.
+
+    ``current_date`` меняется в каждом ответе, поэтому в отпечаток
+    не входит; остальное тело хешируется без разбора JSON.
+    """
+    match = CURRENT_DATE.search(body)
+    current_date = None
+    if match is not None:
+        current_date = int(match.group(1))
+        body = body[: match.start()] + body[match.end():]
+    return hashlib.blake2b(body, digest_size=16).hexdigest(), current_date
+
+
+def record_fingerprint(item) -> Optional[Tuple[str, int]]:
+    """Метод получения ключа и отпечатка работы из ответа API."""
+    if not isinstance(item, dict):
+        return None
+    ident = item.get("id")
+    name = item.get("homework_name")
+    key = str(name if ident is None else ident)
+    return key, hash(
+        (ident, name, item.get("status"), item.get("date_updated"))
+    )
+
+
+class _TenantState:
+    """Подтвержденные и ожидающие отпечатки одного подписчика."""
+
+    __slots__ = ("body", "pending_body", "records", "pending_records")
+
+    def __init__(self):
+        self.body: Optional[str] = None
+        self.pending_body: Optional[str] = None
+        self.records: Dict[str, int] = {}
+        self.pending_records: Dict[str, int] = {}
+
+
+class Fingerprints:
+    """Пропуск ответов и работ, не изменившихся с прошлого опроса.
+
+    Отпечатки запоминаются только после успешного цикла (``commit``),
+    поэтому ответ, обработка которого сорвалась, в следующий раз
+    будет разобран заново. Счетчики пропусков ведутся по подписчикам.
+    """
+
+    def __init__(self):
+        self._tenants: Dict[str, _TenantState] = {}
+        self._counters: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self.decode_seconds = 0.0
+        self.decoded = 0
+
+    def _state(self, tenant: str) -> _TenantState:
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants.setdefault(tenant, _TenantState())
+        return state
+
+    def _count(self, tenant: str, index: int, value: int = 1):
+        with self._lock:
+            counters = self._counters.setdefault(tenant, [0] * len(COUNTERS))
+            counters[index] += value
+
+    def same_body(
+        self, tenant: str, body: bytes
+    ) -> Tuple[bool, Optional[int]]:
+        """Метод сравнения тела ответа с последним обработанным.
+
+        Возвращает признак совпадения и ``current_date`` ответа.
+        """
+        digest, current_date = body_fingerprint(body)
+        state = self._state(tenant)
+        state.pending_body = digest
+        same = digest == state.body and current_date is not None
+        self._count(tenant, 0)
+        if same:
+            self._count(tenant, 1)
+        return same, current_date
+
+    def changed_records(self, tenant: str, homeworks: List) -> List:
+        """Метод отбора работ, отпечаток которых изменился."""
+        state = self._state(tenant)
+        changed = []
+        pending = {}
+        for item in homeworks:
+            fingerprint = record_fingerprint(item)
+            if fingerprint is None:
+                changed.append(item)
+                continue
+            key, digest = fingerprint
+            pending[key] = digest
+            if state.records.get(key) != digest:
+                changed.append(item)
+        state.pending_records = pending
+        self._count(tenant, 2, len(homeworks))
+        self._count(tenant, 3, len(homeworks) - len(changed))
+        return changed
+
+    def commit(self, tenant: str):
+        """Метод запоминания отпечатков успешно обработанного ответа."""
+        state = self._state(tenant)
+        if state.pending_body is not None:
+            state.body, state.pending_body = state.pending_body, None
+        state.records.update(state.pending_records)
+        state.pending_records = {}
+
+    def forget(self, tenant: str):
+        """Метод удаления отпечатков подписчика."""
+        self._tenants.pop(tenant, None)
+        with self._lock:
+            self._counters.pop(tenant, None)
+
+    def observe_decode(self, seconds: float):
+        """Метод учета времени разбора непропущенного ответа."""
+        with self._lock:
+            self.decode_seconds += seconds
+            self.decoded += 1
+
+    def tenant_stats(self, tenant: str) -> Dict[str, float]:
+        """Метод получения счетчиков и долей пропусков подписчика."""
+        with self._lock:
+            counters = list(self._counters.get(tenant, [0] * len(COUNTERS)))
+        return self._rates(dict(zip(COUNTERS, counters)))
+
+    @staticmethod
+    def _rates(stats: Dict[str, float]) -> Dict[str, float]:
+        responses, records = stats["responses"], stats["records"]
+        stats["response_skip_rate"] = (
+            stats["skipped_responses"] / responses if responses else 0.0
+        )
+        stats["record_skip_rate"] = (
+            stats["skipped_records"] / records if records else 0.0
+        )
+        return stats
+
+    def stats(self) -> Dict[str, float]:
+        """Метод получения общих счетчиков и оценки сэкономленного времени.
+
+        Сэкономленное время — пропущенные ответы, умноженные на среднее
+        время разбора непропущенного ответа.
+        """
+        with self._lock:
+            totals = [sum(column) for column in zip(*self._counters.values())]
+            decode_seconds, decoded = self.decode_seconds, self.decoded
+        stats = self._rates(dict(zip(COUNTERS, totals or [0] * 4)))
+        stats["tenants"] = len(self._tenants)
+        stats["saved_seconds"] = (
+            stats["skipped_responses"] * decode_seconds / decoded
+            if decoded
+            else 0.0
+        )
+        return stats
+
+    def collect(self) -> Dict[Labels, float]:
+        """Метод сбора долей пропусков по подписчикам для метрик."""
+        with self._lock:
+            tenants = list(self._counters)
+        return {
+            (("tenant", tenant), ("stat", key)): value
+            for tenant in tenants
+            for key, value in self.tenant_stats(tenant).items()
+        }
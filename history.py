@@ -0,0 +1,299 @@
+"""История смен статусов домашних работ и аналитика по ней."""
+from __future__ import annotations
+
+import logging
+import math
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from settings import DEFAULTS, load_settings
+
+REVIEWING = "reviewing"
+REJECTED = "rejected"
+APPROVED = "approved"
+DAY = 24 * 60 * 60
+
+Transition = Tuple[str, str, Optional[str], str, str, float]
+
+logger = logging.getLogger(__name__)
+
+
+def transition_time(date_updated: str, received: float) -> float:
+    """Метод получения времени смены статуса из ``date_updated``.
+
+    Без даты или с датой в неизвестном формате берется время ответа.
+    """
+    if not date_updated:
+        return received
+    try:
+        moment = datetime.fromisoformat(date_updated.replace("Z", "+00:00"))
+    except ValueError:
+        return received
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class HistoryStore:
+    """Смены статусов в SQLite, записываемые пачками в фоновом потоке.
+
+    ``record`` только кладет смену в очередь, поэтому цикл опроса
+    не ждет диска; при переполненной очереди смена отбрасывается
+    и учитывается в ``dropped``. Вместе со сменой сохраняется, сколько
+    работа пробыла в прежнем статусе, и перцентили времени на проверке
+    читаются по индексу без пересчета всей истории.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULTS.history_db,
+        batch_size: int = DEFAULTS.history_batch_size,
+        flush_interval: float = DEFAULTS.history_flush_interval,
+        queue_size: int = DEFAULTS.history_queue_size,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS transitions ("
+            "id INTEGER PRIMARY KEY, tenant TEXT NOT NULL, "
+            "homework TEXT NOT NULL, old_status TEXT, "
+            "new_status TEXT NOT NULL, at REAL NOT NULL, duration REAL)"
+        )
+        for name, columns in (
+            ("homework", "tenant, homework, at, new_status"),
+            ("duration", "old_status, duration"),
+            ("tenant_duration", "tenant, old_status, duration"),
+            ("at", "at, new_status"),
+        ):
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS transitions_{name} "
+                f"ON transitions ({columns})"
+            )
+        self._db.commit()
+
+    def start(self):
+        """Метод запуска фонового потока записи."""
+        self._thread = threading.Thread(
+            target=self._run, name="history", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def record(self, tenant: str, homework, old_status: Optional[str]):
+        """Метод учета смены статуса записи без ожидания записи."""
+        try:
+            self._queue.put_nowait(
+                (
+                    tenant,
+                    homework.key,
+                    old_status,
+                    homework.status,
+                    homework.date_updated,
+                    self.clock(),
+                )
+            )
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                return
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write(batch)
+                    return
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List[Transition]):
+        try:
+            self.write(batch)
+        except sqlite3.Error as error:
+            logger.error(f"История статусов не записана: {error}")
+
+    def write(self, batch: Iterable[Transition]):
+        """Метод записи пачки смен одной транзакцией."""
+        batch = list(batch)
+        last: Dict[Tuple[str, str], float] = {}
+        rows = []
+        with self._lock:
+            for tenant, key, old, new, date_updated, received in batch:
+                at = transition_time(date_updated, received)
+                previous = last.get((tenant, key))
+                if previous is None:
+                    row = self._db.execute(
+                        "SELECT at FROM transitions "
+                        "WHERE tenant = ? AND homework = ? "
+                        "ORDER BY at DESC LIMIT 1",
+                        (tenant, key),
+                    ).fetchone()
+                    previous = row[0] if row else None
+                duration = None
+                if old is not None and previous is not None:
+                    duration = max(at - previous, 0.0)
+                last[tenant, key] = at
+                rows.append((tenant, key, old, new, at, duration))
+            self._db.executemany(
+                "INSERT INTO transitions "
+                "(tenant, homework, old_status, new_status, at, duration) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+            self.written += len(rows)
+            self.batches += 1
+
+    def percentiles(
+        self,
+        status: str = REVIEWING,
+        quantiles: Iterable[float] = (0.5, 0.9, 0.99),
+        tenant: Optional[str] = None,
+    ) -> Dict[float, float]:
+        """Метод расчета перцентилей времени в статусе, в секундах.
+
+        Перцентиль берется по ближайшему рангу: одна строка индекса
+        на каждое значение, без выборки всех длительностей.
+        """
+        where = "old_status = ? AND duration IS NOT NULL"
+        params: Tuple = (status,)
+        if tenant is not None:
+            where += " AND tenant = ?"
+            params += (tenant,)
+        with self._lock:
+            (count,) = self._db.execute(
+                f"SELECT COUNT(*) FROM transitions WHERE {where}", params
+            ).fetchone()
+            result = {}
+            if not count:
+                return result
+            for quantile in quantiles:
+                rank = math.ceil(quantile * count)
+                offset = min(max(rank - 1, 0), count - 1)
+                (result[quantile],) = self._db.execute(
+                    f"SELECT duration FROM transitions WHERE {where} "
+                    "ORDER BY duration LIMIT 1 OFFSET ?",
+                    (*params, offset),
+                ).fetchone()
+        return result
+
+    def per_day(
+        self, since: float = 0, until: Optional[float] = None
+    ) -> List[Tuple[str, str, int]]:
+        """Метод подсчета смен по дням UTC и новым статусам."""
+        until = self.clock() if until is None else until
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT CAST(at / ? AS INTEGER) AS day, new_status, COUNT(*) "
+                "FROM transitions WHERE at >= ? AND at < ? "
+                "GROUP BY day, new_status ORDER BY day, new_status",
+                (DAY, since, until),
+            ).fetchall()
+        return [
+            (
+                datetime.fromtimestamp(day * DAY, timezone.utc)
+                .date()
+                .isoformat(),
+                status,
+                count,
+            )
+            for day, status, count in rows
+        ]
+
+    def rework_cycles(self, tenant: Optional[str] = None) -> Dict[str, float]:
+        """Метод подсчета возвратов на доработку до принятия работы.
+
+        ``homeworks`` — принятые работы, которые хотя бы раз
+        возвращались, ``cycles`` — сколько всего было возвратов
+        у принятых работ.
+        """
+        where, params = "", ()
+        if tenant is not None:
+            where, params = "WHERE tenant = ?", (tenant,)
+        with self._lock:
+            approved, reworked, cycles = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(rejected > 0), 0), "
+                "COALESCE(SUM(rejected), 0) FROM ("
+                "SELECT SUM(new_status = ?) AS rejected FROM transitions "
+                f"{where} GROUP BY tenant, homework "
+                "HAVING SUM(new_status = ?) > 0)",
+                (REJECTED, *params, APPROVED),
+            ).fetchone()
+        return {
+            "approved": approved,
+            "homeworks": reworked,
+            "cycles": cycles,
+            "average": cycles / reworked if reworked else 0.0,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Метод получения счетчиков записи."""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
+
+    def close(self, timeout: float = 10):
+        """Метод остановки потока после записи очереди и закрытия базы."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            self._db.close()
+
+
+def report(
+    store: HistoryStore, verdicts: Mapping[str, str], days: int = 30
+) -> Dict[str, object]:
+    """Метод сводки: время в каждом статусе, смены по дням, возвраты."""
+    return {
+        "percentiles": {
+            status: store.percentiles(status) for status in verdicts
+        },
+        "per_day": store.per_day(time.time() - days * DAY),
+        "rework": store.rework_cycles(),
+    }
+
+
+def main():
+    """Вывод сводки по истории статусов в JSON."""
+    import json
+
+    import homework
+
+    settings = load_settings()
+    store = HistoryStore(settings.history_db)
+    try:
+        summary = report(store, homework.HOMEWORK_STATUSES)
+    finally:
+        store.close()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
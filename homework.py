@@ -1,30 +1,39 @@
 from __future__ import annotations
 
 import logging
-import os
+import sys
 import time
-from typing import List
+from functools import partial
+from typing import List, Optional, Tuple
 from http import HTTPStatus
 from json import JSONDecodeError
+from operator import attrgetter
 
-import requests
-import telegram
-from dotenv import load_dotenv
-from requests import RequestException
-
-from exceptions import MessageError, StatusCodeError, VariablesError
-
-load_dotenv()
+import logs
+import metrics
+import streaming
+import tracing
+from clock import SystemClock
+from exceptions import (
+    CircuitOpenError,
+    HomeworksError,
+    MessageError,
+    StatusCodeError,
+    VariablesError,
+)
+from records import STATUS_ERROR, Homework, validate
+from settings import DEFAULTS, Settings, load_settings
+from tenants import make_tenant
 
+settings = DEFAULTS
 
-PRACTICUM_TOKEN = os.getenv("PRACTICUM_TOKEN")
-TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+PRACTICUM_TOKEN = settings.practicum_token
+TELEGRAM_TOKEN = settings.telegram_token
+TELEGRAM_CHAT_ID = settings.telegram_chat_id
 
 
-RETRY_TIME = 600
-ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
-HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
+RETRY_TIME = settings.retry_time
+ENDPOINT = settings.practicum_endpoint
 
 
 HOMEWORK_STATUSES = {
@@ -32,49 +41,238 @@ HOMEWORK_STATUSES = {
     "reviewing": "Работа взята на проверку ревьюером.",
     "rejected": "Работа проверена: у ревьюера есть замечания.",
 }
-STATUS_ERROR = "Статус {status} не установлен."
+RECOVERED = "Работа программы восстановлена."
+HOST_FAILURES = (HTTPStatus.TOO_MANY_REQUESTS,)
+
+api_client = None
+status_store = None
+delivery_queue = None
+cursor_journal = None
+status_cache = None
+response_cache = None
+circuits = None
+command_listener = None
+history_store = None
+fingerprints = None
+clock = SystemClock()
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.DEBUG,
-)
+
+
+def setup_logging(new_settings: Settings = DEFAULTS):
+    """Метод настройки журнала при запуске бота."""
+    logs.setup(new_settings)
+
+
+def configure(new_settings: Settings, verdicts=None):
+    """Метод применения настроек при запуске и при перечитывании.
+
+    Каждое значение подменяется одним присваиванием ссылки, поэтому
+    идущие опросы видят либо старое, либо новое значение целиком.
+    """
+    global settings, PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID
+    global RETRY_TIME, ENDPOINT, HOMEWORK_STATUSES
+    if verdicts is not None:
+        HOMEWORK_STATUSES = dict(verdicts)
+        if command_listener is not None:
+            command_listener.verdicts = HOMEWORK_STATUSES
+    settings = new_settings
+    PRACTICUM_TOKEN = settings.practicum_token
+    TELEGRAM_TOKEN = settings.telegram_token
+    TELEGRAM_CHAT_ID = settings.telegram_chat_id
+    RETRY_TIME = settings.retry_time
+    ENDPOINT = settings.practicum_endpoint
+    streaming.STREAM_THRESHOLD = settings.stream_threshold
+    streaming.STREAM_MAX_RECORDS = settings.stream_max_records
+    apply_services(settings)
+
+
+def apply_services(new_settings: Settings):
+    """Метод применения настроек к уже запущенным службам.
+
+    Настройки, которые здесь не применяются, перечислены
+    в ``config.STATIC_FIELDS`` и требуют перезапуска.
+    """
+    if api_client is not None:
+        api_client.timeout = new_settings.http_timeout
+    if delivery_queue is not None:
+        delivery_queue.set_rates(
+            new_settings.telegram_global_rate, new_settings.telegram_chat_rate
+        )
+        delivery_queue.max_attempts = new_settings.outbox_max_attempts
+        delivery_queue.retry = new_settings.outbox_retry
+        delivery_queue.retry_max = new_settings.outbox_retry_max
+        if delivery_queue.outbox is not None:
+            delivery_queue.outbox.retention = new_settings.outbox_retention
+    if cursor_journal is not None:
+        cursor_journal.compact_every = new_settings.journal_compact_every
+    if status_cache is not None:
+        status_cache.size = new_settings.command_cache_size
+        status_cache.ttl = new_settings.command_cache_ttl
+    if response_cache is not None:
+        response_cache.size = new_settings.response_cache_size
+        response_cache.ttl = new_settings.response_cache_ttl
+    if circuits is not None:
+        circuits.configure(
+            new_settings.circuit_failures,
+            new_settings.circuit_reset,
+            new_settings.circuit_probes,
+        )
+    if history_store is not None:
+        history_store.batch_size = new_settings.history_batch_size
+        history_store.flush_interval = new_settings.history_flush_interval
 
 
 def send_message(bot, message):
     """Метод отправки сообщения."""
+    deliver_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def deliver_message(bot, chat_id, message):
+    """Метод отправки сообщения в чат подписчика."""
+    import telegram
+
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
+        bot.send_message(chat_id=chat_id, text=message)
         logger.info("Сообщение отправлено")
     except telegram.error.TelegramError:
         logger.error(MessageError)
         raise MessageError("Сообщение не отправлено")
 
 
+def dispatch(bot, chat_id, message, key=None):
+    """Метод передачи сообщения в очередь отправки.
+
+    Без очереди сообщение отправляется сразу, как в send_message.
+    ``key`` не дает поставить одно уведомление в очередь дважды.
+    """
+    if delivery_queue is None:
+        deliver_message(bot, chat_id, message)
+    else:
+        delivery_queue.put(chat_id, message, key)
+
+
 def get_api_answer(current_timestamp):
     """Метод запроса к API."""
-    timestamp = current_timestamp or int(time.time())
-    params = {"from_date": timestamp}
+    return request_api(PRACTICUM_TOKEN, current_timestamp)
+
+
+def _cached_answer(token, timestamp) -> Tuple[Optional[str], Optional[dict]]:
+    """Метод поиска ответа в кэше: ключ кэша и ответ или ``None``."""
+    if response_cache is None:
+        return None, None
+    from response_cache import cache_key
+
+    key = cache_key(token, timestamp)
+    return key, response_cache.get(key, clock.time())
+
+
+def _cache_answer(key: Optional[str], answer):
+    """Метод сохранения разобранного ответа в кэш."""
+    if key is not None and isinstance(answer, dict):
+        response_cache.put(key, answer, clock.time())
+
+
+def _guarded_get(get, url, headers, params):
+    """Метод запроса к API через автомат отключения хоста.
+
+    Ошибки соединения, ответы 429 и 5xx считаются сбоями хоста.
+    """
+    import requests
+
+    breaker = None if circuits is None else circuits.get(url)
+    if breaker is not None:
+        breaker.before()
     try:
-        response = requests.get(ENDPOINT, headers=HEADERS, params=params)
-    except RequestException as error:
+        with tracing.span("http_get"):
+            response = get(url, headers=headers, params=params, stream=True)
+    except requests.RequestException as error:
+        if breaker is not None:
+            breaker.failure()
         raise ConnectionError(
             f"Ошибка доступа {error}. "
-            f"Проверить API: {ENDPOINT}, "
-            f"токен авторизации: {HEADERS}, "
+            f"Проверить API: {url}, "
+            f"токен авторизации: {headers}, "
             f"апрос с момента времени: {params}",
         )
+    if breaker is not None:
+        code = response.status_code
+        if code in HOST_FAILURES or code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            breaker.failure()
+        else:
+            breaker.success()
+    return response
+
+
+def _skip_unchanged(tenant_key, response, large: bool) -> Optional[dict]:
+    """Метод ответа без работ, если тело совпало с обработанным.
+
+    Потоковые ответы не сравниваются: тело пришлось бы читать целиком.
+    """
+    if fingerprints is None or tenant_key is None or large:
+        return None
+    body = getattr(response, "content", None)
+    if not isinstance(body, bytes):
+        return None
+    same, current_date = fingerprints.same_body(tenant_key, body)
+    if not same:
+        return None
+    return {"homeworks": [], "current_date": current_date}
+
+
+def _decode(response, large: bool):
+    """Метод разбора ответа API с учетом времени разбора."""
+    started = time.perf_counter()
+    with tracing.span("json_decode"):
+        if large:
+            answer = streaming.read_answer(response)
+        else:
+            answer = response.json()
+    if fingerprints is not None:
+        fingerprints.observe_decode(time.perf_counter() - started)
+    return answer
+
+
+def request_api(token, current_timestamp, tenant_key=None):
+    """Метод запроса к API с токеном подписчика.
+
+    С отпечатками и ``tenant_key`` тело, совпавшее с последним
+    обработанным, не разбирается: возвращается ответ без работ.
+    """
+    import requests
+
+    timestamp = current_timestamp or int(clock.time())
+    key, answer = _cached_answer(token, timestamp)
+    if answer is not None:
+        return answer
+    headers = {
+        "Authorization": f"OAuth {token}",
+        "Accept-Encoding": "gzip, deflate",
+    }
+    params = {"from_date": timestamp}
+    get = requests.get if api_client is None else api_client.get
+    endpoint = ENDPOINT
+    response = _guarded_get(get, endpoint, headers, params)
+    if metrics.enabled:
+        metrics.inc("http_responses_total", code=response.status_code)
     if response.status_code != HTTPStatus.OK:
         raise StatusCodeError(
-            f"Ошибка ответа сервера. Проверить API: {ENDPOINT}, "
-            f"токен авторизации: {HEADERS}, "
+            f"Ошибка ответа сервера. Проверить API: {endpoint}, "
+            f"токен авторизации: {headers}, "
             f"запрос с момента времени: {params},"
             f"код возврата {response.status_code}",
         )
+    large = streaming.is_large(response)
+    unchanged = _skip_unchanged(tenant_key, response, large)
+    if unchanged is not None:
+        return unchanged
     try:
-        return response.json()
+        answer = _decode(response, large)
     except JSONDecodeError:
         logger.error("Ответ API не преобразуется в json")
+        return None
+    _cache_answer(key, answer)
+    return answer
 
 
 def check_response(response: dict) -> List:
@@ -104,6 +302,11 @@ def parse_status(homework):
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
+def validate_homeworks(homeworks: List) -> Tuple[List[Homework], List[str]]:
+    """Метод разбора всех работ ответа в записи за один проход."""
+    return validate(homeworks, HOMEWORK_STATUSES)
+
+
 def check_tokens():
     """Метод проверки переменных окружения."""
     if PRACTICUM_TOKEN and TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
@@ -112,27 +315,270 @@ def check_tokens():
         return False
 
 
-def main():
-    """Основная логика работы бота."""
+def fetch_answer(tenant):
+    """Метод запроса ответа API по курсору подписчика."""
+    return request_api(
+        tenant.token, tenant.current_timestamp, tenant.subscriber
+    )
+
+
+def check_answer(response, tenant=None) -> Tuple[List[Homework], List[str]]:
+    """Метод проверки ответа и разбора работ в записи.
+
+    С отпечатками работы, не изменившиеся с прошлого опроса
+    подписчика, не разбираются.
+    """
+    homeworks = check_response(response)
+    if fingerprints is not None and tenant is not None:
+        homeworks = fingerprints.changed_records(tenant.subscriber, homeworks)
+    return validate_homeworks(homeworks)
+
+
+def changed_records(tenant, records: List[Homework]) -> List[Homework]:
+    """Метод отбора записей, статус которых изменился, по дате."""
+    if not records:
+        logger.info("Статус не изменился")
+    changed = []
+    for record in sorted(records, key=attrgetter("date_updated")):
+        if status_store is None or status_store.is_changed(
+            tenant.subscriber, record
+        ):
+            changed.append(record)
+        else:
+            logger.info("Статус не изменился")
+    return changed
+
+
+def notify_records(bot, tenant, changed: List[Homework]):
+    """Метод отправки изменившихся статусов и их сохранения."""
+    for record in changed:
+        key = f"{tenant.subscriber}:{record.event}"
+        dispatch(bot, tenant.chat_id, record.message, key)
+        if status_store is not None:
+            if history_store is not None:
+                previous = status_store.last_status(tenant.subscriber, record)
+                history_store.record(tenant.subscriber, record, previous)
+            status_store.save(tenant.subscriber, record)
+
+
+def advance_cursor(tenant, response, records, errors):
+    """Метод сдвига курсора после обработки ответа.
+
+    Некорректные работы поднимают ``HomeworksError`` уже после сдвига.
+    """
+    if status_cache is not None:
+        status_cache.update(tenant.chat_id, records, clock.time())
+    tenant.current_timestamp = response.get(
+        "current_date", tenant.current_timestamp
+    )
+    if cursor_journal is not None:
+        cursor_journal.record(
+            tenant.subscriber,
+            tenant.current_timestamp,
+            response.get("current_date"),
+        )
+    if errors:
+        raise HomeworksError(errors)
+    if fingerprints is not None:
+        fingerprints.commit(tenant.subscriber)
+
+
+def poll_once(bot, tenant):
+    """Один цикл опроса API для подписчика.
+
+    Корректные работы обрабатываются, даже если в ответе есть
+    некорректные; о последних сообщается одной ошибкой в конце цикла.
+    Это последовательная сборка этапов ``pipeline.Pipeline``.
+    """
+    response = fetch_answer(tenant)
+    records, errors = check_answer(response, tenant)
+    notify_records(bot, tenant, changed_records(tenant, records))
+    advance_cursor(tenant, response, records, errors)
+
+
+def restore_cursor(tenant):
+    """Метод восстановления курсора подписчика из журнала.
+
+    Курсор ведется на каждый чат; старая запись по одному токену
+    берется, только пока своей записи у чата нет.
+    """
+    cursor = None
+    if cursor_journal is not None:
+        cursor = cursor_journal.get(tenant.subscriber) or cursor_journal.get(
+            tenant.key
+        )
+    tenant.current_timestamp = cursor or int(clock.time())
+
+
+def poll_tenant(bot, tenant):
+    """Цикл опроса подписчика с уведомлением о сбоях.
+
+    Возвращает задержку в секундах до следующего опроса. Записи журнала
+    цикла помечаются ключом подписчика.
+    """
+    context = logs.current_tenant.set(tenant.subscriber)
+    try:
+        return _poll_tenant(bot, tenant)
+    finally:
+        logs.current_tenant.reset(context)
+
+
+def _poll_tenant(bot, tenant):
+    try:
+        poll_once(bot, tenant)
+    except Exception as error:
+        return finish_poll(bot, tenant, error)
+    return finish_poll(bot, tenant)
+
+
+def finish_poll(bot, tenant, failure: Optional[Exception] = None):
+    """Метод завершения цикла опроса: уведомления о сбоях и задержка."""
+    if isinstance(failure, CircuitOpenError):
+        logger.debug(f"Опрос {tenant.subscriber} пропущен: {failure}")
+        return max(failure.retry_after, tenant.schedule.floor)
+    if failure is not None:
+        logger.error(f"Сбой в работе программы: {failure}")
+        message = tenant.errors.check(failure, clock.time())
+        if message is not None:
+            notify(bot, tenant.chat_id, message)
+    elif tenant.errors.recover():
+        notify(bot, tenant.chat_id, RECOVERED)
+    statuses = status_store.statuses(tenant.subscriber) if status_store else []
+    delay = tenant.schedule.next_delay(statuses, failure)
+    logger.debug(f"Следующий опрос {tenant.subscriber} через {delay:.0f} с")
+    return delay
+
+
+def notify(bot, chat_id, message):
+    """Метод служебного уведомления, не прерывающий цикл опроса."""
+    try:
+        dispatch(bot, chat_id, message)
+    except MessageError as error:
+        logger.error(f"Уведомление не отправлено: {error}")
+
+
+def start_services(bot, pool_size):
+    """Метод запуска общих служб бота по текущим настройкам."""
+    global api_client, status_store, delivery_queue, cursor_journal
+    global status_cache, response_cache, circuits, history_store
+    global fingerprints
+    from glob import glob
+
+    from circuit import CircuitRegistry
+    from commands import StatusCache
+    from delivery import DeliveryQueue
+    from fingerprints import Fingerprints
+    from history import HistoryStore
+    from http_client import ApiClient
+    from journal import CursorJournal
+    from outbox import Outbox
+    from response_cache import make_cache
+    from status_store import StatusStore
+
+    if settings.metrics_port:
+        metrics.serve(settings.metrics_port, sys.modules[__name__])
+    tracing.setup(settings, sys.modules[__name__])
+    api_client = ApiClient(pool_size, settings.http_timeout)
+    status_store = StatusStore(settings.status_db, settings.status_cache_size)
+    delivery_queue = DeliveryQueue(
+        partial(deliver_message, bot),
+        settings.telegram_global_rate,
+        settings.telegram_chat_rate,
+        Outbox(settings.outbox_db, settings.outbox_retention)
+        if settings.outbox_db
+        else None,
+        settings.outbox_max_attempts,
+        settings.outbox_retry,
+        settings.outbox_retry_max,
+    ).start()
+    cursor_journal = CursorJournal(
+        settings.cursor_journal,
+        settings.journal_compact_every,
+        (
+            glob(settings.cursor_journal_shared)
+            if settings.cursor_journal_shared
+            else ()
+        ),
+    )
+    status_cache = StatusCache(
+        settings.command_cache_size,
+        settings.command_cache_ttl,
+        settings.command_history_length,
+        clock.time,
+    )
+    metrics.stats_gauge("http_client", api_client.stats)
+    metrics.stats_gauge("delivery_queue", delivery_queue.stats)
+    if delivery_queue.outbox is not None:
+        metrics.stats_gauge("outbox", delivery_queue.outbox.stats)
+    if logs.handler is not None:
+        metrics.stats_gauge("logging", logs.handler.stats)
+    response_cache = make_cache(settings)
+    circuits = CircuitRegistry(
+        settings.circuit_failures,
+        settings.circuit_reset,
+        settings.circuit_probes,
+        clock.monotonic,
+    )
+    metrics.registry.gauge("circuit", circuits.collect)
+    if response_cache is not None:
+        metrics.stats_gauge("response_cache", response_cache.stats)
+    if settings.history_db:
+        history_store = HistoryStore(
+            settings.history_db,
+            settings.history_batch_size,
+            settings.history_flush_interval,
+            settings.history_queue_size,
+            clock.time,
+        ).start()
+        metrics.stats_gauge("history", history_store.stats)
+    if settings.incremental:
+        fingerprints = Fingerprints()
+        metrics.stats_gauge("fingerprints", fingerprints.stats)
+        metrics.registry.gauge("tenant_fingerprints", fingerprints.collect)
+
+
+def start_commands(bot):
+    """Метод запуска команд /status и /history, если они включены."""
+    global command_listener
+    from commands import CommandListener
+
+    if not settings.telegram_commands:
+        return None
+    command_listener = CommandListener(
+        bot, status_cache, partial(dispatch, bot), HOMEWORK_STATUSES
+    ).start()
+    return command_listener
+
+
+def startup():
+    """Метод запуска бота: настройки, журнал, бот и службы."""
+    new_settings = load_settings()
+    setup_logging(new_settings)
+    configure(new_settings)
     if not check_tokens():
         logging.critical("Ошибка в переменных окружения")
         raise VariablesError("Проверьте значение токенов")
+    import telegram
+
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
+    start_services(bot, settings.http_pool_size)
+    start_commands(bot)
+    tenant = make_tenant(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, settings)
+    restore_cursor(tenant)
+    return bot, tenant
+
+
+def main():
+    """Основная логика работы бота."""
+    bot, tenant = startup()
     while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            homeworks = check_response(response)
-            if not homeworks:
-                logger.info("Статус не изменился")
-            else:
-                send_message(bot, parse_status(homeworks[0]))
-            current_timestamp = response.get("current_date", current_timestamp)
-            time.sleep(RETRY_TIME)
-        except Exception as error:
-            logger.error(f"Сбой в работе программы: {error}")
-            send_message(bot, message=f"Сбой в работе программы: {error}")
-            time.sleep(RETRY_TIME)
+        with tracing.cycle():
+            delay = poll_tenant(bot, tenant)
+        started = clock.monotonic()
+        clock.sleep(delay)
+        if metrics.enabled:
+            lag = clock.monotonic() - started - delay
+            metrics.observe("loop_lag_seconds", lag)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+"""Пул keep-alive соединений к API с условными запросами."""
+from __future__ import annotations
+
+import threading
+from http import HTTPStatus
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from settings import DEFAULTS
+from streaming import is_large
+
+
+class ApiClient:
+    """Переиспользуемая сессия с пулом соединений.
+
+    Для каждого токена запоминается последний ответ 200 вместе с его
+    ``ETag`` и ``Last-Modified``. Повторный запрос с тем же
+    ``from_date`` уходит условным, и на ответ 304 возвращается
+    сохраненный ответ без повторной загрузки тела. Большие ответы
+    читаются потоково и не сохраняются.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULTS.http_pool_size,
+        timeout: int = DEFAULTS.http_timeout,
+    ):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self._validators: Dict[str, Tuple[object, requests.Response]] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.modified = 0
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        """Метод GET-запроса через пул с условными заголовками."""
+        headers = dict(headers or {})
+        auth = headers.get("Authorization", "")
+        from_date = (params or {}).get("from_date")
+        with self._lock:
+            cached = self._validators.get(auth)
+        if cached is not None and cached[0] == from_date:
+            previous = cached[1]
+            if "ETag" in previous.headers:
+                headers["If-None-Match"] = previous.headers["ETag"]
+            if "Last-Modified" in previous.headers:
+                headers["If-Modified-Since"] = previous.headers[
+                    "Last-Modified"
+                ]
+        kwargs.setdefault("timeout", self.timeout)
+        response = self.session.get(
+            url, headers=headers, params=params, **kwargs
+        )
+        if response.status_code != HTTPStatus.OK or not is_large(response):
+            # Тело читается сразу, чтобы соединение вернулось в пул;
+            # большой ответ 200 читается потоково при разборе.
+            _ = response.content
+        with self._lock:
+            self.requests += 1
+            if response.status_code == HTTPStatus.NOT_MODIFIED and cached:
+                self.not_modified += 1
+                return cached[1]
+            if response.status_code == HTTPStatus.OK:
+                self.modified += 1
+                if is_large(response):
+                    self._validators.pop(auth, None)
+                elif "ETag" in response.headers or (
+                    "Last-Modified" in response.headers
+                ):
+                    self._validators[auth] = (from_date, response)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """Метод получения счетчиков переиспользования соединений."""
+        connections = 0
+        pooled_requests = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            connections += pool.num_connections
+            pooled_requests += pool.num_requests
+        return {
+            "requests": self.requests,
+            "connections": connections,
+            "reused": max(pooled_requests - connections, 0),
+            "not_modified": self.not_modified,
+            "modified": self.modified,
+        }
@@ -0,0 +1,142 @@
+"""Журнал курсоров опроса, переживающий перезапуск."""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from settings import DEFAULTS
+
+logger = logging.getLogger(__name__)
+
+
+class CursorJournal:
+    """Курсор ``current_timestamp`` и ``current_date`` каждого подписчика.
+
+    Каждое изменение дописывается строкой в конец файла и сбрасывается
+    на диск ``fsync``. Через ``compact_every`` записей файл переписывается
+    последними значениями (но не раньше, чем устареет половина строк)
+    и атомарно подменяется. Оборванная при сбое последняя строка
+    при загрузке пропускается и отрезается от файла, чтобы следующая
+    запись не склеилась с ней.
+
+    Журналы ``siblings`` других процессов только читаются при запуске:
+    так подписчик, перешедший к этому процессу, продолжает с самого
+    позднего из известных курсоров.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULTS.cursor_journal,
+        compact_every: int = DEFAULTS.journal_compact_every,
+        siblings: Iterable[str] = (),
+    ):
+        self.path = path
+        self.compact_every = compact_every
+        self.cursors: Dict[str, Tuple[int, Optional[int]]] = {}
+        self._lock = threading.Lock()
+        self._appends = self._load(path)
+        for sibling in siblings:
+            if os.path.abspath(sibling) != os.path.abspath(path):
+                self._load(sibling)
+        self._truncate_torn(path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _truncate_torn(path: str, chunk: int = 4096):
+        if not os.path.exists(path):
+            return
+        with open(path, "rb+") as file:
+            end = file.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(position - chunk, 0)
+                file.seek(start)
+                newline = file.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                file.truncate(position)
+                file.flush()
+                os.fsync(file.fileno())
+
+    def _load(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        loaded: Dict[str, Tuple[int, Optional[int]]] = {}
+        lines = 0
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                parts = line.split()
+                if not line.endswith("\n") or len(parts) != 3:
+                    logger.warning(f"Пропущена строка журнала: {line!r}")
+                    continue
+                key, cursor, current_date = parts
+                loaded[key] = (
+                    int(cursor),
+                    None if current_date == "-" else int(current_date),
+                )
+                lines += 1
+        for key, entry in loaded.items():
+            known = self.cursors.get(key)
+            if known is None or entry[0] > known[0]:
+                self.cursors[key] = entry
+        return lines
+
+    def get(self, key: str) -> Optional[int]:
+        """Метод получения сохраненного курсора подписчика."""
+        entry = self.cursors.get(key)
+        return None if entry is None else entry[0]
+
+    def record(self, key: str, cursor, current_date=None):
+        """Метод записи курсора; неизменный курсор не пишется."""
+        date = None if current_date is None else int(current_date)
+        entry = (int(cursor), date)
+        with self._lock:
+            if self.cursors.get(key) == entry:
+                return
+            self.cursors[key] = entry
+            self._file.write(self._line(key, entry))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._appends += 1
+            if self._appends >= max(
+                self.compact_every, 2 * len(self.cursors)
+            ):
+                self._compact()
+
+    def compact(self):
+        """Метод переписывания журнала последними значениями."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            for key, entry in self.cursors.items():
+                file.write(self._line(key, entry))
+            file.flush()
+            os.fsync(file.fileno())
+        self._file.close()
+        os.replace(temporary, self.path)
+        directory = os.open(os.path.dirname(self.path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._appends = len(self.cursors)
+
+    @staticmethod
+    def _line(key: str, entry: Tuple[int, Optional[int]]) -> str:
+        cursor, current_date = entry
+        date = "-" if current_date is None else current_date
+        return f"{key} {cursor} {date}\n"
+
+    def close(self):
+        """Метод закрытия журнала."""
+        with self._lock:
+            self._file.close()
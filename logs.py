@@ -0,0 +1,194 @@
+"""Журнал через очередь и фоновый поток в формате JSON Lines."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from settings import DEFAULTS, Settings
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+SAMPLER_LIMIT = 100000
+
+current_tenant: ContextVar[Optional[str]] = ContextVar(
+    "current_tenant", default=None
+)
+
+handler: Optional[QueuedHandler] = None
+_listener = None
+_registered = False
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись журнала — один JSON-объект в строке."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Метод сериализации записи."""
+        entry = {
+            "time": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        tenant = getattr(record, "tenant", None)
+        if tenant is not None:
+            entry["tenant"] = tenant
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TenantSampler(logging.Filter):
+    """Прореживает повторяющиеся INFO и DEBUG одного подписчика.
+
+    Повтором считается запись того же подписчика из того же места
+    кода: проходит первая и затем каждая ``every``-я. Записи уровня
+    WARNING и выше не прореживаются.
+    """
+
+    def __init__(self, every: int = DEFAULTS.log_sample_every):
+        super().__init__()
+        self.every = every
+        self._seen: Dict[Tuple[str, str, int], int] = {}
+        self.sampled = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Метод решения, пропускать ли запись."""
+        tenant = current_tenant.get()
+        record.tenant = tenant
+        if (
+            tenant is None
+            or self.every <= 1
+            or record.levelno >= logging.WARNING
+        ):
+            return True
+        key = (tenant, record.pathname, record.lineno)
+        seen = self._seen.get(key, 0)
+        if len(self._seen) >= SAMPLER_LIMIT and not seen:
+            self._seen.clear()
+        self._seen[key] = seen + 1
+        if seen % self.every == 0:
+            return True
+        self.sampled += 1
+        return False
+
+
+class QueuedHandler(logging.Handler):
+    """Кладет записи в ограниченную очередь и не ждет вывода.
+
+    INFO и DEBUG при переполненной очереди отбрасываются, записи
+    уровня WARNING и выше ждут места и не теряются никогда.
+    """
+
+    def __init__(self, records: queue.Queue):
+        super().__init__()
+        self.queue = records
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Метод подготовки записи к передаче в другой поток."""
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord):
+        """Метод постановки записи в очередь."""
+        try:
+            record = self.prepare(record)
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def stats(self) -> Dict[str, int]:
+        """Метод получения счетчиков журнала."""
+        sampled = sum(
+            getattr(log_filter, "sampled", 0) for log_filter in self.filters
+        )
+        return {
+            "depth": self.queue.qsize(),
+            "dropped": self.dropped,
+            "sampled": sampled,
+        }
+
+
+def stop():
+    """Метод остановки фонового потока с выводом очереди."""
+    global _listener, handler
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except RuntimeError:
+            pass
+        _listener = None
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+        handler = None
+
+
+# Поток очереди не переживает fork: дочерний процесс настраивает журнал
+# заново, а унаследованный обработчик просто забывается.
+def _forget():
+    global _listener, handler
+    _listener = None
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+        handler = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget)
+
+
+def reconfigure(settings: Settings):
+    """Метод смены уровня и прореживания журнала без перезапуска."""
+    logging.getLogger().setLevel(settings.log_level)
+    if handler is None:
+        return
+    for item in handler.filters:
+        if isinstance(item, TenantSampler):
+            item.every = settings.log_sample_every
+
+
+def setup(settings: Settings = DEFAULTS):
+    """Метод настройки корневого журнала по настройкам."""
+    global _listener, handler, _registered
+    import atexit
+    from logging.handlers import QueueListener
+
+    stop()
+    output = logging.StreamHandler(sys.stderr)
+    if settings.log_format == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handler = QueuedHandler(queue.Queue(settings.log_queue_size))
+    handler.addFilter(TenantSampler(settings.log_sample_every))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(settings.log_level)
+    _listener = QueueListener(handler.queue, output)
+    _listener.start()
+    if not _registered:
+        atexit.register(stop)
+        _registered = True
+    return handler
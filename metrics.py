@@ -0,0 +1,207 @@
+"""Метрики бота в текстовом формате Prometheus."""
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+PREFIX = "homework_bot_"
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30,
+)
+INSTRUMENTED = (
+    "request_api",
+    "check_response",
+    "parse_status",
+    "validate_homeworks",
+    "deliver_message",
+)
+
+logger = logging.getLogger(__name__)
+
+enabled = False
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Метод учета одного значения."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Registry:
+    """Счетчики, гистограммы и вычисляемые показатели процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.gauges: Dict[str, Callable[[], Dict[Labels, float]]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Метод увеличения счетчика."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Метод учета значения в гистограмме."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    def gauge(self, name: str, collect: Callable[[], Dict[Labels, float]]):
+        """Метод регистрации показателя, вычисляемого при чтении."""
+        self.gauges[name] = collect
+
+    def render(self) -> str:
+        """Метод вывода метрик в текстовом формате Prometheus."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for labels, histogram in series.items():
+                    lines.extend(_histogram(name, labels, histogram))
+        for name, collect in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {PREFIX}{name} gauge")
+            for labels, value in collect().items():
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{value}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+def _histogram(name: str, labels: Labels, histogram: Histogram) -> List[str]:
+    lines = []
+    cumulative = 0
+    bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+    for bound, count in zip(bounds, histogram.counts):
+        cumulative += count
+        bucket = _labels(labels + (("le", bound),))
+        lines.append(f"{PREFIX}{name}_bucket{bucket} {cumulative}")
+    lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {histogram.total}")
+    lines.append(f"{PREFIX}{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+registry = Registry()
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Метод увеличения счетчика в общем реестре."""
+    registry.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    """Метод учета значения гистограммы в общем реестре."""
+    registry.observe(name, value, **labels)
+
+
+def stats_gauge(name: str, stats: Callable[[], Dict[str, float]]):
+    """Метод публикации словаря счетчиков как показателя с меткой stat."""
+    registry.gauge(
+        name,
+        lambda: {(("stat", key),): value for key, value in stats().items()},
+    )
+
+
+def timed(func):
+    """Декоратор учета длительности вызова и выброшенных исключений."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception as error:
+            registry.inc(
+                "errors_total",
+                call=func.__name__,
+                exception=type(error).__name__,
+            )
+            raise
+        finally:
+            registry.observe(
+                "call_seconds",
+                time.perf_counter() - started,
+                call=func.__name__,
+            )
+
+    wrapper.__timed__ = True
+    return wrapper
+
+
+def instrument(module, names: Iterable[str] = INSTRUMENTED):
+    """Метод подмены функций модуля на измеряемые.
+
+    Функции подменяются только при включении метрик, поэтому
+    выключенные метрики ничего не стоят в цикле опроса.
+    """
+    for name in names:
+        func = getattr(module, name)
+        if not getattr(func, "__timed__", False):
+            setattr(module, name, timed(func))
+
+
+def serve(port: int, module=None):
+    """Метод запуска HTTP-сервера метрик в фоновом потоке.
+
+    ``http.server`` импортируется только здесь, чтобы выключенные
+    метрики не замедляли запуск бота.
+    """
+    global enabled
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Обработчик ``GET /metrics``."""
+
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    enabled = True
+    if module is not None:
+        instrument(module)
+    server = ThreadingHTTPServer(("", int(port)), MetricsHandler)
+    threading.Thread(
+        target=server.serve_forever, name="metrics", daemon=True
+    ).start()
+    logger.info(f"Метрики доступны на порту {server.server_port}")
+    return server
@@ -0,0 +1,118 @@
+"""Исходящие сообщения Telegram, сохраненные до отправки."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from settings import DEFAULTS
+
+PENDING = "pending"
+DELIVERED = "delivered"
+ABANDONED = "abandoned"
+
+Entry = Tuple[int, str, str, int]
+
+
+class Outbox:
+    """Сообщения в SQLite: сначала запись, потом отправка.
+
+    Ключ идемпотентности не дает поставить одно и то же уведомление
+    дважды, например если опрос повторился после сбоя. Отправленные
+    и брошенные записи хранятся ``retention`` секунд, чтобы ключи
+    продолжали отсекать повторы, а затем удаляются ``compact``.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULTS.outbox_db,
+        retention: float = DEFAULTS.outbox_retention,
+    ):
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT UNIQUE, "
+            "chat_id TEXT NOT NULL, text TEXT NOT NULL, "
+            "state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "updated REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_state "
+            "ON outbox (state, updated)"
+        )
+        self._db.commit()
+
+    def add(self, chat_id, text: str, key: Optional[str] = None):
+        """Метод записи сообщения; повтор ключа возвращает None."""
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(key, chat_id, text, state, updated) VALUES (?, ?, ?, ?, ?)",
+                (key, str(chat_id), text, PENDING, time.time()),
+            )
+            self._db.commit()
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def pending(self) -> List[Entry]:
+        """Метод получения неотправленных сообщений в порядке записи."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, chat_id, text, attempts FROM outbox "
+                "WHERE state = ? ORDER BY id",
+                (PENDING,),
+            ).fetchall()
+
+    def _mark(self, ids: Iterable[int], state: str, attempt: int = 0):
+        ids = list(ids)
+        if not ids:
+            return
+        with self._lock:
+            self._db.executemany(
+                "UPDATE outbox SET state = ?, attempts = attempts + ?, "
+                "updated = ? WHERE id = ?",
+                [(state, attempt, time.time(), ident) for ident in ids],
+            )
+            self._db.commit()
+
+    def delivered(self, ids: Iterable[int]):
+        """Метод отметки отправленных сообщений."""
+        self._mark(ids, DELIVERED, 1)
+
+    def failed(self, ids: Iterable[int]):
+        """Метод учета неудачной попытки отправки."""
+        self._mark(ids, PENDING, 1)
+
+    def abandon(self, ids: Iterable[int]):
+        """Метод отказа от сообщений, исчерпавших попытки."""
+        self._mark(ids, ABANDONED)
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Метод удаления давно отправленных и брошенных записей."""
+        now = time.time() if now is None else now
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM outbox WHERE state != ? AND updated < ?",
+                (PENDING, now - self.retention),
+            ).rowcount
+            self._db.commit()
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Метод получения числа записей по состояниям."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT state, COUNT(*) FROM outbox GROUP BY state"
+            ).fetchall()
+        counts = {PENDING: 0, DELIVERED: 0, ABANDONED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self):
+        """Метод закрытия базы."""
+        with self._lock:
+            self._db.close()
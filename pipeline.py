@@ -0,0 +1,233 @@
+"""Опрос подписчиков этапами: запрос, проверка, сравнение, отправка."""
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import homework
+import logs
+import metrics
+import tracing
+from settings import DEFAULTS, Settings
+from tenants import Tenant
+
+STAGES = ("fetch", "validate", "diff", "notify")
+
+
+class Job:
+    """Один цикл опроса подписчика, передаваемый между этапами."""
+
+    __slots__ = (
+        "tenant",
+        "done",
+        "trace",
+        "response",
+        "records",
+        "errors",
+        "changed",
+    )
+
+    def __init__(self, tenant: Tenant, done: asyncio.Future):
+        self.tenant = tenant
+        self.done = done
+        self.trace = tracing.new_trace() if tracing.enabled else None
+        self.response = None
+        self.records: List = []
+        self.errors: List[str] = []
+        self.changed: List = []
+
+
+def fetch(bot, job: Job):
+    """Этап запроса ответа API."""
+    job.response = homework.fetch_answer(job.tenant)
+
+
+def validate(bot, job: Job):
+    """Этап проверки ответа и разбора работ."""
+    job.records, job.errors = homework.check_answer(job.response, job.tenant)
+
+
+def diff(bot, job: Job):
+    """Этап отбора изменившихся статусов."""
+    job.changed = homework.changed_records(job.tenant, job.records)
+
+
+def notify(bot, job: Job):
+    """Этап отправки статусов и сдвига курсора."""
+    homework.notify_records(bot, job.tenant, job.changed)
+    homework.advance_cursor(job.tenant, job.response, job.records, job.errors)
+
+
+STEPS: Dict[str, Callable] = {
+    "fetch": fetch,
+    "validate": validate,
+    "diff": diff,
+    "notify": notify,
+}
+
+
+def stage_workers(settings: Settings = DEFAULTS) -> Dict[str, int]:
+    """Метод получения числа исполнителей этапов из настроек.
+
+    Запросы к API ограничены ``engine_concurrency``, как и раньше.
+    """
+    return {
+        "fetch": settings.engine_concurrency,
+        "validate": settings.pipeline_validate_workers,
+        "diff": settings.pipeline_diff_workers,
+        "notify": settings.pipeline_notify_workers,
+    }
+
+
+def _call(job: Job, name: str, func: Callable, *args):
+    context = logs.current_tenant.set(job.tenant.subscriber)
+    try:
+        with tracing.cycle(name), tracing.span(name, job.trace):
+            return func(*args)
+    finally:
+        logs.current_tenant.reset(context)
+
+
+class Stage:
+    """Этап с очередью на входе и своим числом исполнителей."""
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.busy = 0
+        self.processed = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Метод получения заполненности очереди и счетчиков этапа."""
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "workers": self.workers,
+            "busy": self.busy,
+            "processed": self.processed,
+            "failed": self.failed,
+            "seconds": self.seconds,
+        }
+
+
+class Pipeline:
+    """Конвейер этапов опроса, связанных ограниченными очередями.
+
+    Каждый этап выполняется ``workers[name]`` исполнителями в пуле
+    потоков. Когда очередь следующего этапа заполнена, исполнитель
+    ждет места, и давление доходит до ``submit``: новые опросы не
+    начинаются, пока медленный этап не разгрузится. Сбой на любом
+    этапе завершает цикл подписчика так же, как в ``poll_tenant``.
+    """
+
+    def __init__(
+        self,
+        bot,
+        executor: Executor,
+        workers: Dict[str, int],
+        queue_size: int = DEFAULTS.pipeline_queue_size,
+    ):
+        self.bot = bot
+        self.executor = executor
+        self.workers = workers
+        self.queue_size = queue_size
+        self.stages: List[Stage] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Метод запуска исполнителей этапов в текущем цикле событий."""
+        self.stages = [
+            Stage(name, max(self.workers.get(name, 1), 1), self.queue_size)
+            for name in STAGES
+        ]
+        following = self.stages[1:] + [None]
+        for stage, after in zip(self.stages, following):
+            self._tasks.extend(
+                asyncio.create_task(self._work(stage, after))
+                for _ in range(stage.workers)
+            )
+        return self
+
+    def stop(self):
+        """Метод остановки исполнителей."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def submit(self, tenant: Tenant) -> float:
+        """Метод опроса подписчика через конвейер.
+
+        Возвращает задержку до следующего опроса этого подписчика.
+        """
+        if not self._tasks:
+            self.start()
+        job = Job(tenant, asyncio.get_running_loop().create_future())
+        await self.stages[0].queue.put(job)
+        return await job.done
+
+    async def _run(self, name: str, func: Callable, job: Job, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, _call, job, name, func, *args
+        )
+
+    async def _finish(self, job: Job, failure: Optional[Exception] = None):
+        try:
+            delay = await self._run(
+                "finish",
+                homework.finish_poll,
+                job,
+                self.bot,
+                job.tenant,
+                failure,
+            )
+        except Exception as error:
+            if not job.done.done():
+                job.done.set_exception(error)
+            return
+        if not job.done.done():
+            job.done.set_result(delay)
+
+    async def _work(self, stage: Stage, following: Optional[Stage]):
+        step = STEPS[stage.name]
+        while True:
+            job = await stage.queue.get()
+            stage.busy += 1
+            started = time.monotonic()
+            failure = None
+            try:
+                await self._run(stage.name, step, job, self.bot, job)
+            except Exception as error:
+                failure = error
+                stage.failed += 1
+            finally:
+                stage.busy -= 1
+                elapsed = time.monotonic() - started
+                stage.seconds += elapsed
+                stage.processed += 1
+                stage.queue.task_done()
+            if metrics.enabled:
+                metrics.observe(
+                    "pipeline_stage_seconds", elapsed, stage=stage.name
+                )
+            if failure is None and following is not None:
+                await following.queue.put(job)
+            else:
+                await self._finish(job, failure)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Метод получения показателей всех этапов."""
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def collect(self) -> Dict[Tuple[Tuple[str, str], ...], float]:
+        """Метод сбора показателей этапов для метрик."""
+        return {
+            (("stage", stage.name), ("stat", key)): value
+            for stage in self.stages
+            for key, value in stage.stats().items()
+        }
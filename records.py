@@ -0,0 +1,76 @@
+"""Записи о домашних работах, проверенные одним проходом по ответу."""
+from __future__ import annotations
+
+from typing import List, Mapping, NamedTuple, Tuple
+
+STATUS_ERROR = "Статус {status} не установлен."
+
+
+class Homework(NamedTuple):
+    """Неизменяемая запись о работе без словаря атрибутов.
+
+    ``verdict`` ссылается на общую строку из ``HOMEWORK_STATUSES``,
+    а текст сообщения собирается только при обращении к ``message``.
+    """
+
+    key: str
+    name: str
+    status: str
+    date_updated: str
+    verdict: str
+
+    @property
+    def event(self) -> str:
+        """Ключ изменения статуса: работа, статус и время изменения."""
+        return f"{self.key}:{self.status}:{self.date_updated}"
+
+    @property
+    def message(self) -> str:
+        """Текст уведомления об изменении статуса."""
+        return (
+            f'Изменился статус проверки работы "{self.name}". {self.verdict}'
+        )
+
+
+def validate(
+    homeworks: list, verdicts: Mapping[str, str]
+) -> Tuple[List[Homework], List[str]]:
+    """Метод разбора списка работ в записи за один проход.
+
+    Возвращает корректные записи и описания всех некорректных,
+    не прерываясь на первой ошибке. Записи создаются через
+    ``tuple.__new__`` в обход медленного ``Homework.__new__``.
+    """
+    records: List[Homework] = []
+    errors: List[str] = []
+    append = records.append
+    make = tuple.__new__
+    for index, item in enumerate(homeworks):
+        try:
+            name = item["homework_name"]
+            status = item["status"]
+        except (KeyError, TypeError):
+            errors.append(
+                f"Работа #{index}: нет ключей homework_name и status"
+            )
+            continue
+        verdict = verdicts.get(status) if isinstance(status, str) else None
+        if verdict is None:
+            errors.append(
+                f'Работа "{name}": {STATUS_ERROR.format(status=status)}'
+            )
+            continue
+        ident = item.get("id")
+        append(
+            make(
+                Homework,
+                (
+                    str(name if ident is None else ident),
+                    name,
+                    status,
+                    item.get("date_updated") or "",
+                    verdict,
+                ),
+            )
+        )
+    return records, errors
@@ -0,0 +1,189 @@
+"""Кэш ответов API по токену и ``from_date`` с ограниченным сроком жизни."""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from settings import DEFAULTS, Settings
+
+
+def cache_key(token: str, from_date: int) -> str:
+    """Метод получения ключа кэша без самого токена."""
+    digest = hashlib.sha256(token.encode()).hexdigest()[:16]
+    return f"{digest}:{from_date}"
+
+
+class _Counters:
+    """Счетчики попаданий и промахов кэша."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _stats(self, size: int) -> Dict[str, float]:
+        requests = self.hits + self.misses
+        return {
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+        }
+
+
+class MemoryCache(_Counters):
+    """Кэш ответов в памяти процесса с вытеснением по LRU и по времени."""
+
+    def __init__(
+        self,
+        size: int = DEFAULTS.response_cache_size,
+        ttl: float = DEFAULTS.response_cache_ttl,
+    ):
+        super().__init__()
+        self.size = size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[dict]:
+        """Метод получения ответа, если он еще не устарел."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, answer: dict, now: Optional[float] = None):
+        """Метод сохранения ответа."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._entries[key] = (now + self.ttl, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Метод получения счетчиков кэша."""
+        return self._stats(len(self._entries))
+
+    def close(self):
+        """Метод освобождения кэша."""
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(_Counters):
+    """Кэш ответов в SQLite, общий для процессов одной машины.
+
+    Устаревшие записи удаляются при каждой ``size // 10``-й записи,
+    тогда же число записей урезается до ``size``. Счетчики попаданий
+    ведутся в каждом процессе отдельно.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULTS.response_cache_db,
+        size: int = DEFAULTS.response_cache_size,
+        ttl: float = DEFAULTS.response_cache_ttl,
+    ):
+        import sqlite3
+
+        super().__init__()
+        self.size = size
+        self.ttl = ttl
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, expires REAL NOT NULL, "
+            "answer TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_expires "
+            "ON responses (expires)"
+        )
+        self._db.commit()
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[dict]:
+        """Метод получения ответа, если он еще не устарел."""
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._db.execute(
+                "SELECT answer FROM responses WHERE key = ? AND expires > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, answer: dict, now: Optional[float] = None):
+        """Метод сохранения ответа."""
+        now = time.time() if now is None else now
+        text = json.dumps(answer, ensure_ascii=False)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, now + self.ttl, text),
+            )
+            self._puts += 1
+            if self._puts >= max(self.size // 10, 1):
+                self._puts = 0
+                self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now: float):
+        removed = self._db.execute(
+            "DELETE FROM responses WHERE expires <= ?", (now,)
+        ).rowcount
+        removed += self._db.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+            "ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.size,),
+        ).rowcount
+        self.evictions += removed
+
+    def stats(self) -> Dict[str, float]:
+        """Метод получения счетчиков кэша."""
+        with self._lock:
+            (size,) = self._db.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()
+        return self._stats(size)
+
+    def close(self):
+        """Метод закрытия базы."""
+        with self._lock:
+            self._db.close()
+
+
+def make_cache(settings: Settings = DEFAULTS):
+    """Метод создания кэша ответов по настройке ``response_cache``."""
+    if settings.response_cache == "memory":
+        return MemoryCache(
+            settings.response_cache_size, settings.response_cache_ttl
+        )
+    if settings.response_cache == "sqlite":
+        return SQLiteCache(
+            settings.response_cache_db,
+            settings.response_cache_size,
+            settings.response_cache_ttl,
+        )
+    return None
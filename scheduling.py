@@ -0,0 +1,84 @@
+"""Выбор интервала до следующего опроса API."""
+from __future__ import annotations
+
+import random
+from typing import Iterable, Optional
+
+from exceptions import StatusCodeError
+from settings import DEFAULTS
+
+IDLE_GROWTH = 1.5
+MAX_DOUBLINGS = 16
+
+STATUS_DELAYS = {
+    "reviewing": DEFAULTS.poll_reviewing,
+}
+BACKOFF_ERRORS = (StatusCodeError, ConnectionError)
+
+
+class PollScheduler:
+    """Интервал опроса подписчика по статусам его работ.
+
+    Пока работа на проверке, API опрашивается часто, без работ на
+    проверке интервал растет от ``idle`` до ``ceiling``. После
+    ``StatusCodeError`` и ``ConnectionError`` интервал растет
+    экспоненциально со случайным разбросом. Результат всегда лежит
+    в пределах ``floor`` и ``ceiling``.
+    """
+
+    def __init__(
+        self,
+        floor: float = DEFAULTS.poll_floor,
+        ceiling: float = DEFAULTS.poll_ceiling,
+        idle: float = DEFAULTS.poll_idle,
+        status_delays: Optional[dict] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.idle = idle
+        self.status_delays = (
+            STATUS_DELAYS if status_delays is None else status_delays
+        )
+        self.rng = rng or random.Random()
+        self.failures = 0
+        self.idle_cycles = 0
+        self.cycles = 0
+        self.total_delay = 0.0
+        self.last_delay = 0.0
+
+    def next_delay(
+        self,
+        statuses: Iterable[str],
+        error: Optional[BaseException] = None,
+    ) -> float:
+        """Метод выбора задержки до следующего опроса."""
+        if isinstance(error, BACKOFF_ERRORS):
+            self.failures += 1
+            doublings = min(self.failures, MAX_DOUBLINGS)
+            limit = min(self.ceiling, self.floor * 2 ** doublings)
+            delay = self.rng.uniform(limit / 2, limit)
+        else:
+            self.failures = 0
+            active = [
+                self.status_delays[status]
+                for status in statuses
+                if status in self.status_delays
+            ]
+            if active:
+                self.idle_cycles = 0
+                delay = min(active)
+            else:
+                delay = self.idle * IDLE_GROWTH ** self.idle_cycles
+                if delay < self.ceiling:
+                    self.idle_cycles += 1
+        delay = max(self.floor, min(self.ceiling, delay))
+        self.cycles += 1
+        self.total_delay += delay
+        self.last_delay = delay
+        return delay
+
+    @property
+    def average_delay(self) -> float:
+        """Средняя выбранная задержка."""
+        return self.total_delay / self.cycles if self.cycles else 0.0
@@ -0,0 +1,114 @@
+"""Настройки бота из окружения и файла .env."""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, fields
+from typing import Mapping, Optional
+
+CONVERTERS = {
+    "int": int,
+    "Optional[int]": int,
+    "float": float,
+    "bool": lambda value: value.lower() in ("1", "true", "yes", "on"),
+}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Все настройки бота, прочитанные один раз при запуске.
+
+    Имя переменной окружения совпадает с именем поля в верхнем
+    регистре, значения по умолчанию заданы здесь же.
+    """
+
+    practicum_token: Optional[str] = None
+    telegram_token: Optional[str] = None
+    telegram_chat_id: Optional[str] = None
+    practicum_endpoint: str = (
+        "https://practicum.yandex.ru/api/user_api/homework_statuses/"
+    )
+    retry_time: int = 600
+    tenants_file: str = "tenants.json"
+    engine_concurrency: int = 64
+    http_pool_size: int = 10
+    http_timeout: int = 30
+    stream_threshold: int = 1024 * 1024
+    stream_max_records: int = 10000
+    status_db: str = "statuses.sqlite3"
+    status_cache_size: int = 10000
+    alert_window: int = 600
+    alert_max_window: int = 24 * 60 * 60
+    poll_floor: int = 60
+    poll_ceiling: int = 3600
+    poll_idle: int = 600
+    poll_reviewing: int = 120
+    telegram_global_rate: float = 30
+    telegram_chat_rate: float = 1
+    cursor_journal: str = "cursors.log"
+    cursor_journal_shared: str = ""
+    journal_compact_every: int = 10000
+    metrics_port: Optional[int] = None
+    telegram_commands: bool = False
+    command_cache_size: int = 10000
+    command_cache_ttl: int = 24 * 60 * 60
+    command_history_length: int = 10
+    response_cache: str = "memory"
+    response_cache_ttl: int = 60
+    response_cache_size: int = 10000
+    response_cache_db: str = "responses.sqlite3"
+    circuit_failures: int = 5
+    circuit_reset: int = 60
+    circuit_probes: int = 1
+    log_level: str = "DEBUG"
+    log_format: str = "json"
+    log_queue_size: int = 10000
+    log_sample_every: int = 100
+    outbox_db: str = "outbox.sqlite3"
+    outbox_retention: int = 24 * 60 * 60
+    outbox_max_attempts: int = 10
+    outbox_retry: float = 5
+    outbox_retry_max: float = 600
+    config_file: str = "config.json"
+    config_watch_interval: int = 5
+    workers: Optional[int] = None
+    shard_index: int = 0
+    shard_count: int = 1
+    pipeline_queue_size: int = 256
+    pipeline_validate_workers: int = 2
+    pipeline_diff_workers: int = 4
+    pipeline_notify_workers: int = 4
+    history_db: str = "history.sqlite3"
+    history_batch_size: int = 500
+    history_flush_interval: float = 1
+    history_queue_size: int = 100000
+    trace_file: str = ""
+    profile_every: int = 0
+    profile_dir: str = "profiles"
+    profile_keep: int = 50
+    incremental: bool = False
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> Settings:
+        """Метод чтения настроек из переменных окружения."""
+        values = {}
+        for field in fields(cls):
+            raw = environ.get(field.name.upper())
+            if raw is None or raw == "":
+                continue
+            values[field.name] = CONVERTERS.get(field.type, str)(raw)
+        return cls(**values)
+
+
+DEFAULTS = Settings()
+
+
+def load_settings(dotenv: bool = True) -> Settings:
+    """Метод однократной загрузки настроек при запуске бота.
+
+    Файл .env читается здесь, а не при импорте модулей.
+    """
+    if dotenv:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    return Settings.from_env()
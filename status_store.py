@@ -0,0 +1,101 @@
+"""Хранилище последних статусов домашних работ."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from settings import DEFAULTS
+
+
+def homework_key(homework: dict) -> str:
+    """Метод получения ключа работы: id, а без него название."""
+    if homework.get("id") is not None:
+        return str(homework["id"])
+    return str(homework["homework_name"])
+
+
+def key_and_status(homework) -> Tuple[str, str]:
+    """Метод получения ключа и статуса из словаря API или записи."""
+    if isinstance(homework, dict):
+        return homework_key(homework), homework["status"]
+    return homework.key, homework.status
+
+
+class StatusStore:
+    """Последний отправленный статус каждой работы подписчика.
+
+    Статусы лежат в SQLite, чтобы перезапуск не повторял уже
+    отправленные уведомления, а часто читаемые ключи держатся
+    в LRU-кэше в памяти.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULTS.status_db,
+        cache_size: int = DEFAULTS.status_cache_size,
+    ):
+        self.cache_size = cache_size
+        self._cache: OrderedDict[Tuple[str, str], str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS statuses ("
+            "tenant TEXT NOT NULL, homework TEXT NOT NULL, "
+            "status TEXT NOT NULL, PRIMARY KEY (tenant, homework))"
+        )
+        self._db.commit()
+
+    def last_status(self, tenant: str, homework) -> Optional[str]:
+        """Метод получения последнего известного статуса работы."""
+        key = (tenant, key_and_status(homework)[0])
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            row = self._db.execute(
+                "SELECT status FROM statuses "
+                "WHERE tenant = ? AND homework = ?",
+                key,
+            ).fetchone()
+            if row is not None:
+                self._remember(key, row[0])
+                return row[0]
+        return None
+
+    def is_changed(self, tenant: str, homework) -> bool:
+        """Метод проверки, отличается ли статус от сохраненного."""
+        status = key_and_status(homework)[1]
+        return self.last_status(tenant, homework) != status
+
+    def save(self, tenant: str, homework):
+        """Метод сохранения статуса работы."""
+        homework, status = key_and_status(homework)
+        key = (tenant, homework)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO statuses VALUES (?, ?, ?)",
+                (*key, status),
+            )
+            self._db.commit()
+            self._remember(key, status)
+
+    def statuses(self, tenant: str) -> List[str]:
+        """Метод получения текущих статусов всех работ подписчика."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status FROM statuses WHERE tenant = ?", (tenant,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _remember(self, key: Tuple[str, str], status: str):
+        self._cache[key] = status
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def close(self):
+        """Метод закрытия базы."""
+        self._db.close()
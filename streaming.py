@@ -0,0 +1,214 @@
+"""Потоковый разбор больших ответов API."""
+from __future__ import annotations
+
+import codecs
+import heapq
+import json
+import logging
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from settings import DEFAULTS
+
+STREAM_THRESHOLD = DEFAULTS.stream_threshold
+STREAM_MAX_RECORDS = DEFAULTS.stream_max_records
+CHUNK_SIZE = 64 * 1024
+RECORD_FIELDS = ("id", "homework_name", "status", "date_updated")
+
+DECODER = json.JSONDecoder()
+WHITESPACE = " \t\n\r"
+EARLIEST = float("-inf")
+
+logger = logging.getLogger(__name__)
+
+
+def is_large(response) -> bool:
+    """Метод проверки, стоит ли разбирать ответ потоково.
+
+    Потоково читаются ответы без ``Content-Length`` (chunked) и ответы
+    больше ``STREAM_THRESHOLD`` байт. Ответ с испорченным
+    ``Content-Length`` разбирается обычным способом.
+    """
+    headers = getattr(response, "headers", None)
+    if headers is None or not hasattr(response, "iter_content"):
+        return False
+    length = headers.get("Content-Length")
+    if length is None:
+        return True
+    try:
+        return int(length) > STREAM_THRESHOLD
+    except (TypeError, ValueError):
+        return False
+
+
+class _Reader:
+    """Буфер текста поверх байтовых кусков ответа."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        try:
+            text = self._decoder.decode(next(self._chunks))
+        except StopIteration:
+            self.eof = True
+            text = self._decoder.decode(b"", final=True)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while (
+                self.pos < len(self.buffer)
+                and self.buffer[self.pos] in WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise json.JSONDecodeError(
+                    "Неожиданный конец ответа", self.buffer, self.pos
+                )
+
+    def char(self, expected: str) -> str:
+        found = self.peek()
+        if found not in expected:
+            raise json.JSONDecodeError(
+                f"Ожидался один из символов {expected!r}",
+                self.buffer,
+                self.pos,
+            )
+        self.pos += 1
+        return found
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def finish(self):
+        while True:
+            if self.buffer[self.pos:].strip(WHITESPACE):
+                raise json.JSONDecodeError(
+                    "Лишние данные после ответа", self.buffer, self.pos
+                )
+            self.pos = len(self.buffer)
+            if not self.fill():
+                return
+
+
+def iter_homeworks(
+    chunks: Iterable[bytes], fields: Dict[str, object]
+) -> Iterator[dict]:
+    """Метод потокового чтения ответа API по одной работе.
+
+    Записи массива ``homeworks`` отдаются по мере загрузки и не
+    накапливаются в памяти, остальные ключи верхнего уровня
+    (``current_date``) складываются в ``fields``. Данные после
+    объекта ответа, кроме пробелов, считаются ошибкой.
+    """
+    reader = _Reader(chunks)
+    reader.char("{")
+    if reader.peek() == "}":
+        reader.char("}")
+        reader.finish()
+        return
+    while True:
+        key = reader.value()
+        reader.char(":")
+        if key == "homeworks" and reader.peek() == "[":
+            fields[key] = []
+            reader.char("[")
+            if reader.peek() == "]":
+                reader.char("]")
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.char(",]") == "]":
+                        break
+        else:
+            fields[key] = reader.value()
+        if reader.char(",}") == "}":
+            reader.finish()
+            return
+
+
+def compact(homework):
+    """Метод отбрасывания полей записи, не нужных боту."""
+    if not isinstance(homework, dict):
+        return homework
+    return {key: homework[key] for key in RECORD_FIELDS if key in homework}
+
+
+def _moment(homework) -> float:
+    date_updated = (
+        homework.get("date_updated") if isinstance(homework, dict) else None
+    )
+    if not isinstance(date_updated, str):
+        return EARLIEST
+    try:
+        moment = datetime.fromisoformat(date_updated.replace("Z", "+00:00"))
+    except ValueError:
+        return EARLIEST
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def read_answer(response, limit: Optional[int] = None) -> dict:
+    """Метод потокового разбора ответа в словарь с компактными записями.
+
+    В памяти держится не больше ``limit`` записей с самыми ранними
+    ``date_updated``. Если записей больше, ``current_date`` сдвигается
+    только до самой поздней из оставленных, и остальные придут
+    в следующем опросе.
+    """
+    limit = max(STREAM_MAX_RECORDS if limit is None else limit, 1)
+    fields: Dict[str, object] = {}
+    kept: List[Tuple[float, int, object]] = []
+    dropped = 0
+    chunks = response.iter_content(CHUNK_SIZE)
+    for index, homework in enumerate(iter_homeworks(chunks, fields)):
+        item = (-_moment(homework), index, compact(homework))
+        if len(kept) < limit:
+            heapq.heappush(kept, item)
+            continue
+        dropped += 1
+        if item[0] > kept[0][0]:
+            heapq.heapreplace(kept, item)
+    if "homeworks" in fields and isinstance(fields["homeworks"], list):
+        kept.sort(key=itemgetter(1))
+        fields["homeworks"] = [homework for _, _, homework in kept]
+    if dropped:
+        _truncate_cursor(fields, -min(item[0] for item in kept))
+        logger.warning(
+            f"В ответе больше {limit} работ, {dropped} отложены "
+            "до следующего опроса"
+        )
+    return fields
+
+
+def _truncate_cursor(fields: Dict[str, object], latest: float):
+    if latest == EARLIEST:
+        fields.pop("current_date", None)
+        return
+    current_date = fields.get("current_date")
+    if not isinstance(current_date, int) or latest < current_date:
+        fields["current_date"] = int(latest)
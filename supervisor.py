@@ -0,0 +1,270 @@
+"""Несколько процессов опроса с распределением подписчиков по кольцу."""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from dataclasses import replace
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import engine
+import homework
+from config import ConfigSource
+from settings import Settings, load_settings
+from tenants import Tenant
+
+REPLICAS = 128
+MAX_DOUBLINGS = 16
+
+logger = logging.getLogger(__name__)
+
+
+def ring_hash(value: str) -> int:
+    """Метод получения позиции строки на кольце."""
+    return int(hashlib.sha256(value.encode()).hexdigest()[:16], 16)
+
+
+class HashRing:
+    """Кольцо согласованного хеширования с виртуальными узлами.
+
+    Каждый узел занимает ``replicas`` точек кольца, ключ принадлежит
+    ближайшей точке по часовой стрелке. При добавлении или удалении
+    узла переезжает лишь около ``1 / len(nodes)`` ключей.
+    """
+
+    def __init__(self, nodes: Iterable[str], replicas: int = REPLICAS):
+        self.nodes = list(nodes)
+        points = sorted(
+            (ring_hash(f"{node}#{replica}"), node)
+            for node in self.nodes
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        """Метод получения узла, которому принадлежит ключ."""
+        index = bisect.bisect(self._hashes, ring_hash(key))
+        return self._owners[index % len(self._owners)]
+
+
+def worker_count(settings: Settings) -> int:
+    """Метод получения числа процессов на одном dyno."""
+    return settings.workers or os.cpu_count() or 1
+
+
+def shard_nodes(shard: int, workers: int) -> List[str]:
+    """Метод получения имен процессов одного dyno."""
+    return [f"{shard}-{worker}" for worker in range(workers)]
+
+
+def ring_nodes(settings: Settings) -> List[str]:
+    """Метод получения имен процессов всех dyno."""
+    workers = worker_count(settings)
+    return [
+        node
+        for shard in range(settings.shard_count)
+        for node in shard_nodes(shard, workers)
+    ]
+
+
+def assign(tenants: Iterable[Tenant], nodes: Sequence[str], node: str):
+    """Метод отбора подписчиков, принадлежащих процессу ``node``."""
+    ring = HashRing(nodes)
+    return [tenant for tenant in tenants if ring.node_for(tenant.key) == node]
+
+
+def worker_settings(settings: Settings, node: str, index: int) -> Settings:
+    """Метод настроек процесса: свои журнал, исходящие и порт метрик.
+
+    Журналы остальных процессов читаются при запуске, поэтому
+    подписчик, переехавший после изменения числа процессов, не теряет
+    курсор.
+    """
+    root, ext = os.path.splitext(settings.cursor_journal)
+    outbox_root, outbox_ext = os.path.splitext(settings.outbox_db)
+    return replace(
+        settings,
+        cursor_journal=f"{root}.{node}{ext}",
+        outbox_db=settings.outbox_db and f"{outbox_root}.{node}{outbox_ext}",
+        cursor_journal_shared=settings.cursor_journal_shared
+        or f"{root}*{ext}",
+        metrics_port=(
+            settings.metrics_port + index if settings.metrics_port else None
+        ),
+        telegram_commands=False,
+    )
+
+
+def run_worker(node: str, settings: Settings, nodes: List[str], index: int):
+    """Метод работы одного процесса: опрос своей доли подписчиков.
+
+    Процесс без подписчиков продолжает работать, чтобы подхватить их
+    при перечитывании настроек.
+    """
+    homework.setup_logging(worker_settings(settings, node, index))
+    source = ConfigSource(
+        settings,
+        homework.HOMEWORK_STATUSES,
+        transform=partial(worker_settings, node=node, index=index),
+        select=partial(assign, nodes=nodes, node=node),
+    )
+    engine.serve(source, allow_empty=True)
+
+
+def _bootstrap(target: Callable, node: str, *args):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    target(node, *args)
+
+
+class Supervisor:
+    """Запускает процессы опроса и перезапускает упавшие.
+
+    Процесс, завершившийся с ненулевым кодом, перезапускается с паузой,
+    которая удваивается при частых падениях от ``backoff``
+    до ``max_backoff``. Курсоры переживают перезапуск благодаря
+    журналу, который процесс пишет на диск после каждого изменения.
+    SIGHUP пересылается процессам, и они перечитывают настройки.
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[str],
+        target: Callable,
+        args: Callable[[str], tuple] = lambda node: (),
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.nodes = list(nodes)
+        self.target = target
+        self.args = args
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.processes: Dict[str, Optional[multiprocessing.Process]] = {}
+        self.restarts: Dict[str, int] = {node: 0 for node in self.nodes}
+        self._crashes: Dict[str, int] = {node: 0 for node in self.nodes}
+        self._started: Dict[str, float] = {}
+        self._next_start: Dict[str, float] = {}
+        self._stopping = False
+
+    def start(self):
+        """Метод запуска всех процессов."""
+        now = time.monotonic()
+        for node in self.nodes:
+            self._spawn(node, now)
+        return self
+
+    def _spawn(self, node: str, now: float):
+        process = multiprocessing.Process(
+            target=_bootstrap,
+            args=(self.target, node, *self.args(node)),
+            name=f"worker-{node}",
+        )
+        process.start()
+        self.processes[node] = process
+        self._started[node] = now
+
+    def check(self, now: Optional[float] = None):
+        """Метод проверки процессов и перезапуска упавших."""
+        now = time.monotonic() if now is None else now
+        for node in self.nodes:
+            process = self.processes.get(node)
+            if process is None:
+                if node in self._next_start and now >= self._next_start[node]:
+                    del self._next_start[node]
+                    self._spawn(node, now)
+                continue
+            if process.is_alive():
+                continue
+            process.join()
+            self.processes[node] = None
+            if process.exitcode == 0:
+                logger.info(f"Процесс {node} завершил работу")
+                continue
+            if now - self._started[node] >= self.max_backoff:
+                self._crashes[node] = 0
+            doublings = min(self._crashes[node], MAX_DOUBLINGS)
+            delay = min(self.backoff * 2 ** doublings, self.max_backoff)
+            self._crashes[node] += 1
+            self.restarts[node] += 1
+            self._next_start[node] = now + delay
+            logger.error(
+                f"Процесс {node} упал с кодом {process.exitcode}, "
+                f"перезапуск через {delay:.0f} с"
+            )
+
+    def alive(self) -> bool:
+        """Есть работающие или ожидающие перезапуска процессы."""
+        return bool(self._next_start) or any(
+            process is not None for process in self.processes.values()
+        )
+
+    def stop(self, timeout: float = 10):
+        """Метод остановки всех процессов."""
+        self._next_start.clear()
+        running = [
+            process
+            for process in self.processes.values()
+            if process is not None and process.is_alive()
+        ]
+        for process in running:
+            process.terminate()
+        for process in running:
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    def run(self, interval: float = 1.0):
+        """Метод наблюдения за процессами до сигнала остановки."""
+
+        def shutdown(signum, frame):
+            self._stopping = True
+
+        def forward(signum, frame):
+            for process in self.processes.values():
+                if process is not None and process.is_alive():
+                    os.kill(process.pid, signum)
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, forward)
+        self.start()
+        try:
+            while not self._stopping and self.alive():
+                self.check()
+                time.sleep(interval)
+        finally:
+            self.stop()
+
+
+def main():
+    """Запуск процессов опроса для доли подписчиков этого dyno."""
+    settings = load_settings()
+    homework.setup_logging(settings)
+    if settings.telegram_commands:
+        logger.warning(
+            "Команды /status и /history работают только в engine.py, "
+            "в режиме нескольких процессов они отключены"
+        )
+    nodes = ring_nodes(settings)
+    local = shard_nodes(settings.shard_index, worker_count(settings))
+    logger.info(f"Запуск {len(local)} процессов, всего на кольце {len(nodes)}")
+    Supervisor(
+        local,
+        run_worker,
+        lambda node: (settings, nodes, local.index(node)),
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
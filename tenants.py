@@ -0,0 +1,95 @@
+"""Подписчики бота: токен Практикума, чат и курсор опроса."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import List
+
+from alerts import ErrorNotifier
+from scheduling import PollScheduler
+from settings import DEFAULTS, Settings
+
+
+@dataclass
+class Tenant:
+    """Подписчик: чей токен опрашиваем и куда отправляем статусы."""
+
+    token: str
+    chat_id: str
+    current_timestamp: int = 0
+    errors: ErrorNotifier = field(
+        default_factory=ErrorNotifier, repr=False, compare=False
+    )
+    schedule: PollScheduler = field(
+        default_factory=PollScheduler, repr=False, compare=False
+    )
+
+    @property
+    def key(self) -> str:
+        """Обезличенный идентификатор токена.
+
+        Общий для всех чатов одного токена: по нему делятся курсор,
+        кэш ответов и процесс супервизора.
+        """
+        return hashlib.sha256(self.token.encode()).hexdigest()[:16]
+
+    @property
+    def subscriber(self) -> str:
+        """Идентификатор пары токен и чат для статусов, логов и задач."""
+        return f"{self.key}:{self.chat_id}"
+
+
+def make_tenant(token, chat_id, settings: Settings = DEFAULTS) -> Tenant:
+    """Метод создания подписчика с интервалами и окнами из настроек."""
+    return Tenant(
+        token=token,
+        chat_id=str(chat_id),
+        errors=ErrorNotifier(settings.alert_window, settings.alert_max_window),
+        schedule=PollScheduler(
+            floor=settings.poll_floor,
+            ceiling=settings.poll_ceiling,
+            idle=settings.poll_idle,
+            status_delays={"reviewing": settings.poll_reviewing},
+        ),
+    )
+
+
+def update_tenant(tenant: Tenant, chat_id, settings: Settings = DEFAULTS):
+    """Метод применения новых чата и интервалов к работающему подписчику.
+
+    Курсор, история сбоев и счетчики планировщика сохраняются.
+    """
+    tenant.chat_id = str(chat_id)
+    tenant.errors.window = settings.alert_window
+    tenant.errors.max_window = settings.alert_max_window
+    tenant.schedule.floor = settings.poll_floor
+    tenant.schedule.ceiling = settings.poll_ceiling
+    tenant.schedule.idle = settings.poll_idle
+    tenant.schedule.status_delays = {"reviewing": settings.poll_reviewing}
+
+
+def load_tenants(settings: Settings = DEFAULTS) -> List[Tenant]:
+    """Метод загрузки подписчиков из JSON-файла или окружения.
+
+    Файл ``tenants_file`` содержит список объектов с ключами ``token``
+    и ``chat_id``. Если файла нет, единственный подписчик берется
+    из ``practicum_token`` и ``telegram_chat_id``, как
+    в однопользовательском режиме.
+    """
+    path = settings.tenants_file
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            entries = json.load(file)
+        return [
+            make_tenant(entry["token"], entry["chat_id"], settings)
+            for entry in entries
+        ]
+    if settings.practicum_token and settings.telegram_chat_id:
+        return [
+            make_tenant(
+                settings.practicum_token, settings.telegram_chat_id, settings
+            )
+        ]
+    return []
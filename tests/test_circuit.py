@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+import requests
+
+from test_engine import RecordingBot
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+
+    def test_open_half_open_closed(self):
+        from circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+        from exceptions import CircuitOpenError
+
+        clock = Clock()
+        breaker = CircuitBreaker(failures=3, reset=60, probes=1, clock=clock)
+        for _ in range(3):
+            breaker.before()
+            breaker.failure()
+        assert breaker.state == OPEN, (
+            'Проверьте, что цепь размыкается после порога сбоев'
+        )
+        clock.now = 30
+        with pytest.raises(CircuitOpenError) as raised:
+            breaker.before()
+        assert raised.value.retry_after == 30
+
+        clock.now = 60
+        breaker.before()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before()
+        breaker.failure()
+        assert breaker.state == OPEN, (
+            'Проверьте, что неудачная проба снова размыкает цепь'
+        )
+
+        clock.now = 120
+        breaker.before()
+        breaker.success()
+        assert breaker.state == CLOSED, (
+            'Проверьте, что удачная проба замыкает цепь'
+        )
+        assert breaker.stats()['trips'] == 2
+
+    def test_registry_passes_clock(self):
+        from circuit import OPEN, CircuitRegistry
+        from exceptions import CircuitOpenError
+
+        clock = Clock()
+        breaker = CircuitRegistry(failures=1, reset=60, clock=clock).get(
+            'http://api/homework_statuses/'
+        )
+        breaker.before()
+        breaker.failure()
+        assert breaker.state == OPEN
+        clock.now = 59
+        with pytest.raises(CircuitOpenError):
+            breaker.before()
+        clock.now = 60
+        breaker.before()
+        assert breaker.state != OPEN, (
+            'Проверьте, что предохранители хоста идут по часам реестра'
+        )
+
+    def test_open_circuit_pauses_without_messages(self, monkeypatch):
+        import homework
+        from circuit import CircuitRegistry
+        from tenants import Tenant
+
+        calls = []
+
+        class Response:
+            status_code = HTTPStatus.SERVICE_UNAVAILABLE
+
+        def get(*args, **kwargs):
+            calls.append(kwargs['params'])
+            return Response()
+
+        monkeypatch.setattr(requests, 'get', get)
+        monkeypatch.setattr(
+            homework, 'circuits', CircuitRegistry(failures=2, reset=600)
+        )
+        tenants = [Tenant(token=f'token-{n}', chat_id=str(n))
+                   for n in range(5)]
+        bot = RecordingBot()
+        delays = [homework.poll_tenant(bot, tenant) for tenant in tenants]
+
+        assert len(calls) == 2, (
+            'Проверьте, что при разомкнутой цепи запросы не отправляются'
+        )
+        assert len(bot.sent) == 2, (
+            'Проверьте, что при разомкнутой цепи сообщения об ошибке '
+            'не отправляются'
+        )
+        assert min(delays[2:]) >= 599, (
+            'Проверьте, что опрос приостанавливается до пробы'
+        )
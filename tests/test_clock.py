@@ -0,0 +1,94 @@
+import time
+from http import HTTPStatus
+
+import requests
+
+from test_engine import RecordingBot
+
+DAY = 24 * 60 * 60
+START = 1600000000
+
+
+class VirtualResponse:
+
+    def __init__(self, answer):
+        self.status_code = HTTPStatus.OK
+        self.answer = answer
+        self.headers = {}
+
+    def json(self):
+        return self.answer
+
+
+class TestVirtualTime:
+
+    def test_scheduler_runs_calls_in_order(self):
+        from clock import Scheduler, VirtualClock
+
+        clock = VirtualClock(START)
+        scheduler = Scheduler(clock)
+        calls = []
+        scheduler.call_later(20, lambda: calls.append(('b', clock.time())))
+        scheduler.call_later(10, lambda: calls.append(('a', clock.time())))
+        scheduler.call_later(99, lambda: calls.append(('c', clock.time())))
+        assert scheduler.run(START + 50) == 2
+        assert calls == [('a', START + 10), ('b', START + 20)], (
+            'Проверьте, что вызовы идут по сроку и сдвигают часы'
+        )
+        assert clock.time() == START + 50
+
+    def test_week_of_polling_runs_instantly(self, monkeypatch):
+        import homework
+        from clock import VirtualClock, simulate
+        from settings import DEFAULTS
+        from status_store import StatusStore
+        from tenants import make_tenant
+
+        clock = VirtualClock(START)
+        monkeypatch.setattr(homework, 'clock', clock)
+        store = StatusStore(':memory:')
+        monkeypatch.setattr(homework, 'status_store', store)
+        timeline = [(START + DAY, 'reviewing'), (START + 2 * DAY, 'approved')]
+        calls = []
+
+        def virtual_get(url, headers=None, params=None, **kwargs):
+            calls.append((headers['Authorization'], clock.time()))
+            homeworks = [
+                {'id': 1, 'homework_name': 'hw', 'status': status,
+                 'date_updated': ''}
+                for moment, status in timeline
+                if params['from_date'] <= moment <= clock.time()
+            ][-1:]
+            return VirtualResponse(
+                {'homeworks': homeworks, 'current_date': int(clock.time())}
+            )
+
+        monkeypatch.setattr(requests, 'get', virtual_get)
+        tenants = [make_tenant(f't{index}', index) for index in range(50)]
+        for tenant in tenants:
+            homework.restore_cursor(tenant)
+        bot = RecordingBot()
+
+        started = time.monotonic()
+        result = simulate(
+            tenants, lambda tenant: homework.poll_tenant(bot, tenant),
+            7 * DAY, clock, spread=600,
+        )
+        assert time.monotonic() - started < 10, (
+            'Проверьте, что виртуальное время не ждет по-настоящему'
+        )
+        assert clock.time() == START + 7 * DAY
+        assert result['polls'] == len(calls)
+        assert len(bot.sent) == 2 * len(tenants), (
+            'Проверьте, что каждая смена статуса отправлена один раз'
+        )
+        in_review = [
+            moment for auth, moment in calls
+            if auth == 'OAuth t0' and START + DAY < moment <= START + 2 * DAY
+        ]
+        gaps = {b - a for a, b in zip(in_review, in_review[1:])}
+        assert gaps == {DEFAULTS.poll_reviewing}, (
+            'Проверьте, что работа на проверке опрашивается '
+            'каждые poll_reviewing секунд'
+        )
+        store.close()
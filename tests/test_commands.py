@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import requests
+
+
+def make_update(chat_id):
+    return SimpleNamespace(effective_chat=SimpleNamespace(id=chat_id))
+
+
+class TestStatusCache:
+
+    def test_size_and_ttl_are_bounded(self):
+        from commands import StatusCache
+
+        cache = StatusCache(size=2, ttl=10, history_length=2)
+        for chat_id in range(3):
+            cache.update(chat_id, [], now=0)
+        assert len(cache) == 2 and cache.get(0, now=1) is None, (
+            'Проверьте, что кэш ограничен по размеру'
+        )
+        assert cache.get(2, now=5) is not None
+        assert cache.get(2, now=11) is None, (
+            'Проверьте, что устаревшие записи не отдаются'
+        )
+
+    def test_history_keeps_last_transitions(self):
+        from commands import StatusCache
+
+        cache = StatusCache(history_length=2)
+        for status in ('reviewing', 'rejected', 'reviewing', 'approved'):
+            cache.update(1, [{'id': 7, 'homework_name': 'hw',
+                              'status': status}])
+        entry = cache.get(1)
+        assert [record[1] for record in entry.history] == [
+            'reviewing', 'approved'
+        ]
+        assert list(entry.homeworks.values()) == [('hw', 'approved', '')]
+
+
+class TestCommandListener:
+
+    def test_commands_never_call_api(self, monkeypatch):
+        import homework
+        from commands import NO_DATA, CommandListener, StatusCache
+
+        def forbidden_get(*args, **kwargs):
+            raise AssertionError('Команды не должны обращаться к API')
+
+        monkeypatch.setattr(requests, 'get', forbidden_get)
+        replies = []
+        cache = StatusCache()
+        cache.update(1, [{'homework_name': 'hw', 'status': 'approved'}])
+        listener = CommandListener(
+            None, cache, lambda chat_id, text: replies.append((chat_id, text)),
+            homework.HOMEWORK_STATUSES,
+        )
+        for _ in range(50):
+            listener.status(make_update(1), None)
+        listener.history(make_update(2), None)
+
+        assert replies[0][1].startswith(
+            '"hw": Работа проверена: ревьюеру всё понравилось. Ура!'
+        ), 'Проверьте, что /status отвечает из кэша'
+        assert replies[-1] == (2, NO_DATA)
+
+    def test_status_age_follows_cache_clock(self):
+        from commands import CommandListener, StatusCache
+
+        now = [1000.0]
+        replies = []
+        cache = StatusCache(ttl=600, clock=lambda: now[0])
+        cache.update(1, [{'homework_name': 'hw', 'status': 'approved'}])
+        listener = CommandListener(
+            None, cache, lambda chat_id, text: replies.append(text), {},
+        )
+        now[0] += 5 * 60
+        listener.status(make_update(1), None)
+        assert replies[-1].endswith('Проверено 5 мин назад.'), (
+            'Проверьте, что возраст ответа считается по часам кэша'
+        )
+        now[0] += 600
+        listener.status(make_update(1), None)
+        assert replies[-1].startswith('Данных о работах пока нет'), (
+            'Проверьте, что срок жизни кэша считается по часам кэша'
+        )
@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import pytest
+import requests
+
+from test_engine import MockTenantResponse, RecordingBot
+
+
+@pytest.fixture
+def restore_homework(monkeypatch):
+    import homework
+
+    for name in ('settings', 'HOMEWORK_STATUSES', 'RETRY_TIME', 'ENDPOINT',
+                 'PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID'):
+        monkeypatch.setattr(homework, name, getattr(homework, name))
+    return homework
+
+
+def write(path, data):
+    path.write_text(json.dumps(data), encoding='utf-8')
+
+
+class TestConfigSource:
+
+    def test_overrides_and_verdicts(self, tmp_path):
+        from config import ConfigSource
+        from settings import Settings
+
+        config_file = tmp_path / 'config.json'
+        tenants_file = tmp_path / 'tenants.json'
+        write(config_file, {
+            'poll_floor': '30',
+            'homework_statuses': {'approved': 'Принято!'},
+        })
+        write(tenants_file, [{'token': 'first', 'chat_id': 1}])
+        source = ConfigSource(
+            Settings(config_file=str(config_file),
+                     tenants_file=str(tenants_file)),
+            {'approved': 'Старый текст', 'rejected': 'Отклонено'},
+        )
+        settings, verdicts, tenants = source.load()
+        assert settings.poll_floor == 30
+        assert verdicts == {'approved': 'Принято!', 'rejected': 'Отклонено'}
+        assert [tenant.chat_id for tenant in tenants] == ['1']
+        assert not source.changed(settings)
+
+        write(config_file, {'unknown': 1})
+        assert source.changed(settings), (
+            'Проверьте, что изменение файла настроек замечается'
+        )
+        with pytest.raises(ValueError):
+            source.load()
+
+
+class TestFields:
+
+    def test_every_field_static_or_reloaded(self):
+        from dataclasses import fields
+
+        from config import RELOADED_FIELDS, STATIC_FIELDS
+        from settings import Settings
+
+        names = {field.name for field in fields(Settings)}
+        assert not set(STATIC_FIELDS) & set(RELOADED_FIELDS)
+        assert names == set(STATIC_FIELDS) | set(RELOADED_FIELDS), (
+            'Проверьте, что каждая настройка либо применяется '
+            'при перечитывании, либо требует перезапуска'
+        )
+
+    def test_configure_applies_to_services(
+        self, monkeypatch, restore_homework
+    ):
+        from circuit import CircuitRegistry
+        from delivery import DeliveryQueue
+        from response_cache import MemoryCache
+        from settings import Settings
+
+        circuits = CircuitRegistry(failures=5)
+        breaker = circuits.get('http://api/homework_statuses/')
+        queue = DeliveryQueue(lambda chat_id, text: None, 30, 1)
+        monkeypatch.setattr(restore_homework, 'circuits', circuits)
+        monkeypatch.setattr(restore_homework, 'delivery_queue', queue)
+        monkeypatch.setattr(
+            restore_homework, 'response_cache', MemoryCache(ttl=60)
+        )
+        restore_homework.configure(Settings(
+            circuit_failures=2, telegram_chat_rate=0.5,
+            response_cache_ttl=5, outbox_retry=1,
+        ))
+        assert breaker.failures == 2, (
+            'Проверьте, что пороги применяются к созданным предохранителям'
+        )
+        assert circuits.get('http://other/').failures == 2
+        assert queue.chat_rate == 0.5
+        assert queue.retry == 1
+        assert restore_homework.response_cache.ttl == 5
+
+
+class TestReload:
+
+    def test_tenants_added_and_removed(
+        self, tmp_path, monkeypatch, restore_homework
+    ):
+        import engine
+        from config import ConfigSource
+        from settings import Settings
+
+        def mock_response_get(url, headers=None, params=None, **kwargs):
+            token = headers['Authorization'].split(' ', 1)[1]
+            return MockTenantResponse(token, params['from_date'])
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        tenants_file = tmp_path / 'tenants.json'
+        write(tenants_file, [{'token': 'first', 'chat_id': 1},
+                             {'token': 'second', 'chat_id': 2}])
+        source = ConfigSource(
+            Settings(config_file=str(tmp_path / 'config.json'),
+                     tenants_file=str(tenants_file), retry_time=3600),
+            restore_homework.HOMEWORK_STATUSES,
+        )
+        settings, verdicts, tenants = source.load()
+        bot = RecordingBot()
+        polling = engine.PollingEngine(
+            bot, tenants, retry_time=3600, source=source
+        )
+
+        async def scenario():
+            running = asyncio.create_task(polling.run())
+            await asyncio.sleep(0.2)
+            first = polling._tasks[tenants[0].subscriber]
+            write(tenants_file, [{'token': 'first', 'chat_id': 1},
+                                 {'token': 'third', 'chat_id': 3}])
+            write(tmp_path / 'config.json', {
+                'homework_statuses': {'approved': 'Принято!'},
+            })
+            polling.reload()
+            await asyncio.sleep(0.2)
+            running.cancel()
+            return first
+
+        first = asyncio.run(scenario())
+        assert sorted(t.chat_id for t in polling.tenants) == ['1', '3'], (
+            'Проверьте, что подписчики добавляются и удаляются на ходу'
+        )
+        assert polling._tasks[tenants[0].subscriber] is first, (
+            'Проверьте, что опрос оставшегося подписчика не прерывается'
+        )
+        assert ('3', 'Изменился статус проверки работы "hw-third". '
+                     'Принято!') in bot.sent, (
+            'Проверьте, что новые тексты вердиктов применяются'
+        )
@@ -0,0 +1,60 @@
+import threading
+import time
+
+
+class TestDeliveryQueue:
+
+    def test_lines_for_one_chat_are_merged(self):
+        from delivery import DeliveryQueue
+
+        sent = []
+        release = threading.Event()
+
+        def send(chat_id, text):
+            release.wait(5)
+            sent.append((chat_id, text))
+
+        queue = DeliveryQueue(send, global_rate=100, chat_rate=100).start()
+        queue.put(1, 'first')
+        time.sleep(0.05)
+        queue.put(1, 'second')
+        queue.put(1, 'third')
+        queue.put(2, 'other')
+        release.set()
+        queue.close()
+
+        assert sent == [
+            ('1', 'first'), ('1', 'second\n\nthird'), ('2', 'other')
+        ], 'Проверьте, что ожидающие строки одного чата склеиваются'
+        assert queue.stats()['merged'] == 1
+        assert queue.stats()['depth'] == 0
+
+    def test_chat_rate_is_limited(self):
+        from delivery import DeliveryQueue
+
+        times = []
+        queue = DeliveryQueue(
+            lambda chat_id, text: times.append(time.monotonic()),
+            global_rate=100, chat_rate=20,
+        ).start()
+        for index in range(3):
+            queue.put(1, 'x' * 4000)
+        queue.close()
+        assert len(times) == 3, (
+            'Проверьте, что длинные строки не склеиваются сверх лимита'
+        )
+        assert times[2] - times[0] >= 0.09, (
+            'Проверьте, что частота отправки в чат ограничена'
+        )
+
+    def test_put_does_not_wait_for_send(self):
+        from delivery import DeliveryQueue
+
+        queue = DeliveryQueue(lambda chat_id, text: time.sleep(0.2)).start()
+        started = time.monotonic()
+        for chat_id in range(5):
+            queue.put(chat_id, 'text')
+        assert time.monotonic() - started < 0.1, (
+            'Проверьте, что постановка в очередь не ждет отправки'
+        )
+        assert queue.depth() >= 4
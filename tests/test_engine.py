@@ -0,0 +1,145 @@
+import asyncio
+from http import HTTPStatus
+
+import requests
+
+from test_bot import MockTelegramBot
+
+
+class MockTenantResponse:
+
+    def __init__(self, token, from_date):
+        self.status_code = HTTPStatus.OK
+        self.token = token
+        self.from_date = from_date
+
+    def json(self):
+        return {
+            "homeworks": [
+                {'homework_name': f'hw-{self.token}', 'status': 'approved'}
+            ],
+            "current_date": self.from_date + 1
+        }
+
+
+class RecordingBot(MockTelegramBot):
+
+    def __init__(self, **kwargs):
+        super().__init__(token='1234:abcdefg', **kwargs)
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+        return super().send_message(chat_id=chat_id, text=text, **kwargs)
+
+
+class TestPollingEngine:
+
+    def test_tenants_keep_own_cursor_and_chat(self, monkeypatch):
+        def mock_response_get(url, headers=None, params=None, **kwargs):
+            token = headers['Authorization'].split(' ', 1)[1]
+            return MockTenantResponse(token, params['from_date'])
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+
+        import engine
+        from tenants import Tenant
+
+        tenants = [
+            Tenant(token='first', chat_id='1', current_timestamp=100),
+            Tenant(token='second', chat_id='2', current_timestamp=200),
+        ]
+        bot = RecordingBot()
+        polling = engine.PollingEngine(bot, tenants, concurrency=2)
+
+        async def poll_all():
+            await asyncio.gather(*(polling.poll(t) for t in tenants))
+
+        asyncio.run(poll_all())
+
+        assert [t.current_timestamp for t in tenants] == [101, 201], (
+            'Проверьте, что у каждого подписчика свой курсор опроса'
+        )
+        assert sorted(bot.sent) == [
+            ('1', 'Изменился статус проверки работы "hw-first". '
+                  'Работа проверена: ревьюеру всё понравилось. Ура!'),
+            ('2', 'Изменился статус проверки работы "hw-second". '
+                  'Работа проверена: ревьюеру всё понравилось. Ура!'),
+        ], 'Проверьте, что статус отправляется в чат своего подписчика'
+
+
+class TestErrorNotifier:
+
+    def test_repeated_errors_are_suppressed(self):
+        from alerts import ErrorNotifier
+
+        notifier = ErrorNotifier(window=10, max_window=40)
+        assert notifier.check(ConnectionError('from_date 1'), now=0)
+        assert notifier.check(ConnectionError('from_date 2'), now=5) is None, (
+            'Проверьте, что повтор сбоя в окне подавляется'
+        )
+        assert notifier.check(KeyError('homeworks'), now=5), (
+            'Проверьте, что новый тип сбоя отправляется сразу'
+        )
+        message = notifier.check(ConnectionError('from_date 3'), now=10)
+        assert message and message.endswith('(повторов без уведомления: 1)')
+        assert notifier.check(ConnectionError('from_date 4'), now=25) is None, (
+            'Проверьте, что окно подавления растет'
+        )
+        assert notifier.recover() and not notifier.recover(), (
+            'Проверьте, что о восстановлении сообщается один раз'
+        )
+
+    def test_failed_error_message_does_not_escape(self, monkeypatch):
+        import telegram
+
+        import homework
+        from tenants import Tenant
+
+        class FailingBot:
+            def send_message(self, chat_id=None, text=None):
+                raise telegram.error.TelegramError('down')
+
+        def broken_get(*args, **kwargs):
+            raise requests.RequestException('boom')
+
+        monkeypatch.setattr(requests, 'get', broken_get)
+        homework.poll_tenant(FailingBot(), Tenant(token='t', chat_id='1'))
+
+
+class TestSharedToken:
+
+    def test_two_chats_on_one_token_both_notified(self, monkeypatch,
+                                                  tmp_path):
+        import engine
+        import homework
+        from status_store import StatusStore
+        from tenants import make_tenant
+
+        def mock_response_get(url, headers=None, params=None, **kwargs):
+            return MockTenantResponse('same', params['from_date'])
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        store = StatusStore(str(tmp_path / 'statuses.sqlite3'))
+        monkeypatch.setattr(homework, 'status_store', store)
+        tenants = [make_tenant('same', '111'), make_tenant('same', '222')]
+        for tenant in tenants:
+            tenant.current_timestamp = 100
+        bot = RecordingBot()
+        polling = engine.PollingEngine(bot, tenants, concurrency=2)
+
+        async def poll_all():
+            await asyncio.gather(*(polling.poll(t) for t in tenants))
+            for tenant in tenants:
+                polling.add(tenant, 3600)
+            return dict(polling._tasks)
+
+        tasks = asyncio.run(poll_all())
+        store.close()
+
+        assert sorted(chat for chat, _ in bot.sent) == ['111', '222'], (
+            'Проверьте, что чаты с общим токеном получают статус каждый'
+        )
+        assert len(tasks) == 2 and len(polling.tenants) == 2, (
+            'Проверьте, что у каждого чата своя задача опроса'
+        )
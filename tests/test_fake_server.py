@@ -0,0 +1,63 @@
+import json
+import sys
+import threading
+import time
+from os.path import abspath, dirname, join
+
+import pytest
+
+sys.path.append(join(dirname(dirname(abspath(__file__))), 'benchmarks'))
+
+
+@pytest.fixture
+def fake_api(tmp_path, monkeypatch):
+    import fake_server
+    import homework
+
+    script = tmp_path / 'script.json'
+    script.write_text(json.dumps({
+        'scripted': [[-100, 'hw1', 'reviewing'], [-50, 'hw1', 'approved'],
+                     [3600, 'hw2', 'reviewing']],
+    }))
+    options = fake_server.parse_args(['--port', '0', '--script', str(script)])
+    server = fake_server.make_server(options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        homework, 'ENDPOINT',
+        f'http://127.0.0.1:{server.server_port}{fake_server.PATH}'
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestFakeServer:
+
+    def test_from_date_and_script(self, fake_api):
+        import homework
+
+        started = int(fake_api.scenario.started)
+        answer = homework.request_api('scripted', started - 200)
+        assert [(hw['homework_name'], hw['status'])
+                for hw in answer['homeworks']] == [('hw1', 'approved')], (
+            'Проверьте, что сервер отдает последний статус по сценарию'
+        )
+        assert answer['current_date'] >= started
+        assert homework.request_api('scripted', started)['homeworks'] == [], (
+            'Проверьте, что работы до from_date не возвращаются'
+        )
+
+    def test_errors_are_scripted(self, fake_api):
+        import homework
+        from exceptions import StatusCodeError
+
+        fake_api.options.error_rate = 1.0
+        with pytest.raises(StatusCodeError):
+            homework.request_api('scripted', int(time.time()))
+        fake_api.options.error_rate = 0.0
+        fake_api.options.malformed_rate = 1.0
+        assert homework.request_api('scripted', int(time.time())) is None, (
+            'Проверьте ветку JSONDecodeError на битом JSON'
+        )
+        assert fake_api.statuses == {503: 1, 200: 1}
@@ -0,0 +1,84 @@
+import json
+from http import HTTPStatus
+
+import requests
+
+from test_engine import RecordingBot
+
+
+class BodyResponse:
+    decoded = 0
+
+    def __init__(self, homeworks, current_date):
+        self.status_code = HTTPStatus.OK
+        self.headers = {}
+        self.content = json.dumps(
+            {'homeworks': homeworks, 'current_date': current_date}
+        ).encode()
+
+    def json(self):
+        BodyResponse.decoded += 1
+        return json.loads(self.content)
+
+
+class TestFingerprints:
+
+    def test_body_fingerprint_ignores_current_date(self):
+        from fingerprints import body_fingerprint
+
+        first = body_fingerprint(b'{"homeworks": [], "current_date": 1}')
+        second = body_fingerprint(b'{"homeworks": [], "current_date": 22}')
+        assert first[0] == second[0] and second[1] == 22, (
+            'Проверьте, что current_date не входит в отпечаток ответа'
+        )
+
+    def test_unchanged_body_and_records_are_skipped(self, monkeypatch):
+        import homework
+        from fingerprints import Fingerprints
+        from tenants import Tenant
+
+        first = {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing',
+                 'date_updated': '2022-01-01T00:00:00Z'}
+        second = {'id': 2, 'homework_name': 'hw2', 'status': 'approved',
+                  'date_updated': '2022-01-01T00:00:00Z'}
+        answers = [
+            ([first, second], 101),
+            ([first, second], 102),
+            ([first, dict(second, status='rejected')], 103),
+            ([first, {'homework_name': 'bad'}], 104),
+            ([first, {'homework_name': 'bad'}], 105),
+        ]
+
+        def mock_get(url, headers=None, params=None, **kwargs):
+            return BodyResponse(*answers.pop(0))
+
+        monkeypatch.setattr(requests, 'get', mock_get)
+        monkeypatch.setattr(BodyResponse, 'decoded', 0)
+        fingerprints = Fingerprints()
+        monkeypatch.setattr(homework, 'fingerprints', fingerprints)
+        tenant = Tenant(token='t', chat_id='1', current_timestamp=100)
+        bot = RecordingBot()
+
+        homework.poll_once(bot, tenant)
+        homework.poll_once(bot, tenant)
+        assert BodyResponse.decoded == 1, (
+            'Проверьте, что неизменившийся ответ не разбирается'
+        )
+        assert tenant.current_timestamp == 102
+        homework.poll_once(bot, tenant)
+        assert len(bot.sent) == 3
+        for _ in range(2):
+            try:
+                homework.poll_once(bot, tenant)
+            except ValueError:
+                pass
+        assert BodyResponse.decoded == 4, (
+            'Проверьте, что ответ с ошибками разбирается заново'
+        )
+        stats = fingerprints.tenant_stats(tenant.subscriber)
+        assert stats['skipped_responses'] == 1
+        assert stats['response_skip_rate'] == 0.2
+        assert stats['skipped_records'] == 3, (
+            'Проверьте, что неизменившиеся работы не разбираются'
+        )
+        assert fingerprints.stats()['saved_seconds'] > 0
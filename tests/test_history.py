@@ -0,0 +1,73 @@
+class TestHistoryStore:
+
+    def test_transitions_and_analytics(self, tmp_path):
+        from history import HistoryStore, report
+        from records import Homework
+
+        def record(key, status, date):
+            return Homework(key, f'hw{key}', status, date, '')
+
+        store = HistoryStore(str(tmp_path / 'history.sqlite3')).start()
+        store.record('t', record('1', 'reviewing', '2022-01-01T00:00:00Z'),
+                     None)
+        store.record('t', record('1', 'rejected', '2022-01-01T01:00:00Z'),
+                     'reviewing')
+        store.record('t', record('1', 'reviewing', '2022-01-02T00:00:00Z'),
+                     'rejected')
+        store.record('t', record('1', 'approved', '2022-01-02T03:00:00Z'),
+                     'reviewing')
+        store.record('t', record('2', 'reviewing', '2022-01-02T00:00:00Z'),
+                     None)
+        store.record('t', record('2', 'approved', '2022-01-02T02:00:00Z'),
+                     'reviewing')
+        store.close()
+        assert store.stats()['written'] == 6, (
+            'Проверьте, что очередь записывается при закрытии'
+        )
+
+        store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+        assert store.percentiles('reviewing', (0.5, 1.0)) == {
+            0.5: 2 * 3600, 1.0: 3 * 3600
+        }, 'Проверьте перцентили времени на проверке'
+        assert store.percentiles('reviewing', tenant='other') == {}
+        assert store.per_day(until=1e10) == [
+            ('2022-01-01', 'rejected', 1),
+            ('2022-01-01', 'reviewing', 1),
+            ('2022-01-02', 'approved', 2),
+            ('2022-01-02', 'reviewing', 2),
+        ]
+        assert store.rework_cycles() == {
+            'approved': 2, 'homeworks': 1, 'cycles': 1, 'average': 1.0
+        }, 'Проверьте подсчет возвратов до принятия работы'
+        summary = report(store, {'reviewing': '', 'approved': ''})
+        assert set(summary['percentiles']) == {'reviewing', 'approved'}
+        store.close()
+
+    def test_full_queue_drops_without_blocking(self, tmp_path):
+        from history import HistoryStore
+        from records import Homework
+
+        store = HistoryStore(str(tmp_path / 'h.sqlite3'), queue_size=1)
+        homework = Homework('1', 'hw1', 'approved', '', '')
+        store.record('t', homework, None)
+        store.record('t', homework, 'reviewing')
+        assert store.stats()['dropped'] == 1
+        store.close()
+
+    def test_received_time_from_clock(self, tmp_path):
+        from history import DAY, HistoryStore
+        from records import Homework
+
+        store = HistoryStore(
+            str(tmp_path / 'h.sqlite3'), clock=lambda: 3 * DAY + 1
+        ).start()
+        store.record('t', Homework('1', 'hw1', 'approved', '', ''), None)
+        store.close()
+
+        store = HistoryStore(
+            str(tmp_path / 'h.sqlite3'), clock=lambda: 4 * DAY
+        )
+        assert store.per_day() == [('1970-01-04', 'approved', 1)], (
+            'Проверьте, что время без date_updated берется из часов'
+        )
+        store.close()
@@ -0,0 +1,73 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    body = json.dumps({'homeworks': [], 'current_date': 1}).encode()
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    server = HTTPServer(('127.0.0.1', 0), ETagHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
+
+
+class TestApiClient:
+
+    def test_conditional_get_and_reuse(self, etag_server):
+        from http_client import ApiClient
+
+        client = ApiClient(pool_size=2)
+        headers = {'Authorization': 'OAuth token'}
+        for _ in range(3):
+            response = client.get(
+                etag_server, headers=headers, params={'from_date': 0}
+            )
+            assert response.status_code == 200, (
+                'Проверьте, что на ответ 304 возвращается сохраненный ответ'
+            )
+            assert response.json()['current_date'] == 1
+
+        stats = client.stats()
+        assert stats['modified'] == 1 and stats['not_modified'] == 2, (
+            'Проверьте, что повторные запросы отправляются условными'
+        )
+        assert stats['connections'] == 1 and stats['reused'] == 2, (
+            'Проверьте, что соединение переиспользуется'
+        )
+
+    def test_new_cursor_is_unconditional(self, etag_server):
+        from http_client import ApiClient
+
+        client = ApiClient()
+        headers = {'Authorization': 'OAuth token'}
+        client.get(etag_server, headers=headers, params={'from_date': 0})
+        client.get(etag_server, headers=headers, params={'from_date': 1})
+        assert client.stats()['not_modified'] == 0, (
+            'Проверьте, что условный запрос не отправляется '
+            'при новом from_date'
+        )
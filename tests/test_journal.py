@@ -0,0 +1,116 @@
+class TestCursorJournal:
+
+    def test_restart_resumes_cursor(self, tmp_path):
+        from journal import CursorJournal
+
+        path = str(tmp_path / 'cursors.log')
+        journal = CursorJournal(path)
+        journal.record('first', 100, 100)
+        journal.record('first', 100, 100)
+        journal.record('second', 200)
+        journal.record('first', 150, 150)
+        journal.close()
+        with open(path) as file:
+            assert len(file.readlines()) == 3, (
+                'Проверьте, что неизменный курсор не дописывается'
+            )
+        with open(path, 'a') as file:
+            file.write('first 999')
+
+        restarted = CursorJournal(path)
+        assert restarted.get('first') == 150, (
+            'Проверьте, что оборванная строка журнала пропускается'
+        )
+        assert restarted.get('second') == 200
+        assert restarted.get('unknown') is None
+        restarted.record('second', 250)
+        restarted.close()
+
+        again = CursorJournal(path)
+        assert again.get('second') == 250, (
+            'Проверьте, что запись после оборванной строки не теряется'
+        )
+        assert again.get('first') == 150
+        again.close()
+
+    def test_compaction_keeps_latest(self, tmp_path):
+        from journal import CursorJournal
+
+        path = str(tmp_path / 'cursors.log')
+        journal = CursorJournal(path, compact_every=5)
+        for cursor in range(1, 12):
+            journal.record('tenant', cursor, cursor)
+        with open(path) as file:
+            assert len(file.readlines()) < 5, (
+                'Проверьте, что журнал периодически сжимается'
+            )
+        journal.close()
+        assert CursorJournal(path).get('tenant') == 11
+
+    def test_poll_records_cursor(self, tmp_path, monkeypatch):
+        import requests
+
+        import homework
+        from journal import CursorJournal
+        from tenants import Tenant
+
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return {'homeworks': [], 'current_date': 500}
+
+        monkeypatch.setattr(requests, 'get', lambda *a, **k: Response())
+        journal = CursorJournal(str(tmp_path / 'cursors.log'))
+        monkeypatch.setattr(homework, 'cursor_journal', journal)
+        tenant = Tenant(token='t', chat_id='1', current_timestamp=1)
+        homework.poll_once(None, tenant)
+        restored = Tenant(token='t', chat_id='1')
+        homework.restore_cursor(restored)
+        assert restored.current_timestamp == 500, (
+            'Проверьте, что курсор восстанавливается после перезапуска'
+        )
+
+    def test_chats_on_one_token_keep_own_cursor(self, tmp_path, monkeypatch):
+        import homework
+        from journal import CursorJournal
+        from tenants import make_tenant
+
+        path = str(tmp_path / 'cursors.log')
+        journal = CursorJournal(path)
+        monkeypatch.setattr(homework, 'cursor_journal', journal)
+        behind, ahead = make_tenant('same', '111'), make_tenant('same', '222')
+        homework.advance_cursor(behind, {'current_date': 100}, [], [])
+        homework.advance_cursor(ahead, {'current_date': 500}, [], [])
+        journal.close()
+
+        monkeypatch.setattr(homework, 'cursor_journal', CursorJournal(path))
+        restored = [make_tenant('same', '111'), make_tenant('same', '222')]
+        for tenant in restored:
+            homework.restore_cursor(tenant)
+        homework.cursor_journal.close()
+        assert [t.current_timestamp for t in restored] == [100, 500], (
+            'Проверьте, что после перезапуска каждый чат продолжает '
+            'со своего курсора'
+        )
+
+    def test_siblings_keep_latest_cursor(self, tmp_path):
+        from journal import CursorJournal
+
+        moved = CursorJournal(str(tmp_path / 'cursors.0-0.log'))
+        moved.record('tenant', 300, 300)
+        moved.record('other', 50)
+        moved.close()
+        own = CursorJournal(str(tmp_path / 'cursors.0-1.log'))
+        own.record('tenant', 100, 100)
+        own.close()
+
+        restarted = CursorJournal(
+            str(tmp_path / 'cursors.0-1.log'),
+            siblings=[str(path) for path in tmp_path.glob('cursors*.log')],
+        )
+        assert restarted.get('tenant') == 300, (
+            'Проверьте, что из журналов других процессов берется '
+            'самый поздний курсор'
+        )
+        assert restarted.get('other') == 50
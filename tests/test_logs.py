@@ -0,0 +1,66 @@
+import json
+import logging
+import queue
+import threading
+
+
+def make_record(level, message, lineno=1):
+    return logging.LogRecord(
+        'homework', level, __file__, lineno, message, None, None
+    )
+
+
+class TestLogs:
+
+    def test_sampler_thins_repeats_per_tenant(self):
+        from logs import TenantSampler, current_tenant
+
+        sampler = TenantSampler(every=10)
+        context = current_tenant.set('tenant')
+        try:
+            passed = sum(
+                sampler.filter(make_record(logging.INFO, 'Без изменений'))
+                for _ in range(30)
+            )
+            errors = sum(
+                sampler.filter(make_record(logging.ERROR, 'Сбой', lineno=2))
+                for _ in range(30)
+            )
+        finally:
+            current_tenant.reset(context)
+        assert passed == 3, (
+            'Проверьте, что повторы INFO одного подписчика прореживаются'
+        )
+        assert errors == 30, 'Проверьте, что ERROR не прореживаются'
+        assert sampler.filter(make_record(logging.INFO, 'Без подписчика'))
+
+    def test_full_queue_drops_info_keeps_errors(self):
+        from logs import QueuedHandler
+
+        records = queue.Queue(maxsize=1)
+        handler = QueuedHandler(records)
+        handler.emit(make_record(logging.INFO, 'first'))
+        handler.emit(make_record(logging.INFO, 'second'))
+        assert handler.dropped == 1, (
+            'Проверьте, что INFO отбрасывается при переполнении очереди'
+        )
+        thread = threading.Thread(
+            target=handler.emit, args=(make_record(logging.ERROR, 'error'),)
+        )
+        thread.start()
+        messages = [records.get(timeout=5).getMessage() for _ in range(2)]
+        thread.join(5)
+        assert messages == ['first', 'error'], (
+            'Проверьте, что ERROR дожидается места в очереди'
+        )
+
+    def test_json_format(self):
+        from logs import JsonFormatter
+
+        record = make_record(logging.WARNING, 'Ошибка %s')
+        record.args = ('API',)
+        record.tenant = 'abc'
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry['message'] == 'Ошибка API'
+        assert entry['level'] == 'WARNING'
+        assert entry['tenant'] == 'abc'
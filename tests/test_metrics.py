@@ -0,0 +1,51 @@
+import types
+import urllib.request
+
+import pytest
+
+from exceptions import StatusCodeError
+
+
+class TestMetrics:
+
+    def test_instrumented_calls_are_measured(self):
+        import metrics
+
+        def request_api(token, timestamp):
+            if token is None:
+                raise StatusCodeError('500')
+            return {}
+
+        module = types.SimpleNamespace(request_api=request_api)
+        metrics.instrument(module, ['request_api'])
+        metrics.instrument(module, ['request_api'])
+        assert module.request_api.__wrapped__ is request_api, (
+            'Проверьте, что функция оборачивается один раз'
+        )
+        module.request_api('token', 1)
+        with pytest.raises(StatusCodeError):
+            module.request_api(None, 1)
+
+        text = metrics.registry.render()
+        assert (
+            'homework_bot_errors_total{call="request_api",'
+            'exception="StatusCodeError"} 1'
+        ) in text, 'Проверьте счетчик исключений по классам'
+        assert (
+            'homework_bot_call_seconds_bucket{call="request_api",le="+Inf"}'
+        ) in text, 'Проверьте гистограмму длительности вызовов'
+
+    def test_endpoint_serves_prometheus_text(self):
+        import metrics
+
+        metrics.stats_gauge('delivery_queue', lambda: {'depth': 3})
+        server = metrics.serve(0)
+        try:
+            url = f'http://127.0.0.1:{server.server_port}/metrics'
+            with urllib.request.urlopen(url) as response:
+                text = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+            metrics.enabled = False
+        assert 'homework_bot_delivery_queue{stat="depth"} 3' in text
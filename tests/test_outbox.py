@@ -0,0 +1,113 @@
+import time
+
+from exceptions import MessageError
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestOutbox:
+
+    def test_failed_message_is_retried(self, tmp_path):
+        from delivery import DeliveryQueue
+        from outbox import Outbox
+
+        sent = []
+
+        def send(chat_id, text):
+            if not sent:
+                sent.append(None)
+                raise MessageError('Telegram недоступен')
+            sent.append((chat_id, text))
+
+        outbox = Outbox(str(tmp_path / 'outbox.sqlite3'))
+        queue = DeliveryQueue(
+            send, global_rate=100, chat_rate=100, outbox=outbox, retry=0.05
+        ).start()
+        queue.put(1, 'status', key='tenant:1:approved')
+        queue.put(1, 'status', key='tenant:1:approved')
+        assert wait_for(lambda: len(sent) == 2), (
+            'Проверьте, что неудачная отправка повторяется'
+        )
+        queue.close()
+        assert sent[1] == ('1', 'status'), (
+            'Проверьте, что сообщение с тем же ключом не дублируется'
+        )
+        assert wait_for(lambda: outbox.stats()['delivered'] == 1)
+        assert outbox.stats()['pending'] == 0
+        assert outbox.compact(now=time.time() + 10 ** 6) == 1, (
+            'Проверьте, что отправленные записи удаляются при сжатии'
+        )
+
+    def test_pending_messages_survive_restart(self, tmp_path):
+        from delivery import DeliveryQueue
+        from outbox import Outbox
+
+        path = str(tmp_path / 'outbox.sqlite3')
+        stopped = DeliveryQueue(
+            lambda chat_id, text: None, outbox=Outbox(path)
+        )
+        stopped.put(2, 'before crash')
+        stopped.outbox.close()
+
+        sent = []
+        outbox = Outbox(path)
+        queue = DeliveryQueue(
+            lambda chat_id, text: sent.append((chat_id, text)),
+            outbox=outbox,
+        ).start()
+        queue.close()
+        assert sent == [('2', 'before crash')], (
+            'Проверьте, что неотправленные сообщения отправляются '
+            'после перезапуска'
+        )
+
+    def test_message_abandoned_after_max_attempts(self, tmp_path):
+        from delivery import DeliveryQueue
+        from outbox import Outbox
+
+        def send(chat_id, text):
+            raise MessageError('chat not found')
+
+        outbox = Outbox(str(tmp_path / 'outbox.sqlite3'))
+        queue = DeliveryQueue(
+            send, global_rate=100, chat_rate=100, outbox=outbox,
+            max_attempts=3, retry=0.01,
+        ).start()
+        queue.put(3, 'lost')
+        assert wait_for(lambda: queue.stats()['abandoned'] == 1)
+        queue.close()
+        assert outbox.stats()['abandoned'] == 1
+        assert queue.stats()['failed'] == 3
+
+    def test_unexpected_error_does_not_stop_delivery(self, tmp_path):
+        from delivery import DeliveryQueue
+        from outbox import Outbox
+
+        sent = []
+
+        def send(chat_id, text):
+            if not sent:
+                sent.append(None)
+                raise RuntimeError('неожиданный сбой')
+            sent.append((chat_id, text))
+
+        queue = DeliveryQueue(
+            send, global_rate=100, chat_rate=100,
+            outbox=Outbox(str(tmp_path / 'outbox.sqlite3')), retry=0.05,
+        ).start()
+        queue.put(1, 'status', key='tenant:1:approved')
+        assert wait_for(lambda: len(sent) == 2), (
+            'Проверьте, что после неожиданной ошибки отправка повторяется'
+        )
+        assert queue.stats()['alive'], (
+            'Проверьте, что поток отправки не завершается при ошибке'
+        )
+        queue.close()
+        assert sent[1] == ('1', 'status')
+        assert queue.stats()['failed'] == 1
+        assert not queue.stats()['alive']
@@ -0,0 +1,76 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from test_engine import MockTenantResponse, RecordingBot
+
+
+class TestPipeline:
+
+    def run(self, bot, tenants, queue_size=1):
+        from pipeline import Pipeline
+
+        executor = ThreadPoolExecutor(max_workers=4)
+        workers = {'fetch': 2, 'validate': 1, 'diff': 1, 'notify': 1}
+        pipeline = Pipeline(bot, executor, workers, queue_size)
+
+        async def poll_all():
+            try:
+                return await asyncio.gather(
+                    *(pipeline.submit(tenant) for tenant in tenants)
+                )
+            finally:
+                pipeline.stop()
+
+        try:
+            return asyncio.run(poll_all()), pipeline.stats()
+        finally:
+            executor.shutdown()
+
+    def test_stages_process_every_tenant(self, monkeypatch):
+        from tenants import Tenant
+
+        def mock_response_get(url, headers=None, params=None, **kwargs):
+            token = headers['Authorization'].split(' ', 1)[1]
+            return MockTenantResponse(token, params['from_date'])
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        tenants = [
+            Tenant(token=f't{index}', chat_id=str(index),
+                   current_timestamp=index * 100)
+            for index in range(1, 6)
+        ]
+        bot = RecordingBot()
+        delays, stats = self.run(bot, tenants)
+
+        assert len(delays) == 5 and all(delay > 0 for delay in delays)
+        assert [t.current_timestamp for t in tenants] == [
+            101, 201, 301, 401, 501
+        ], 'Проверьте, что курсор сдвигается после всех этапов'
+        assert len(bot.sent) == 5
+        assert {name: stage['processed'] for name, stage in stats.items()} == {
+            'fetch': 5, 'validate': 5, 'diff': 5, 'notify': 5
+        }, 'Проверьте, что этапы считают обработанные задания'
+        assert all(stage['capacity'] == 1 for stage in stats.values())
+
+    def test_failed_stage_finishes_poll(self, monkeypatch):
+        from tenants import Tenant
+
+        def broken_get(*args, **kwargs):
+            raise requests.RequestException('boom')
+
+        monkeypatch.setattr(requests, 'get', broken_get)
+        tenant = Tenant(token='t', chat_id='1', current_timestamp=100)
+        bot = RecordingBot()
+        delays, stats = self.run(bot, [tenant])
+
+        assert delays[0] > 0
+        assert stats['fetch']['failed'] == 1
+        assert stats['validate']['processed'] == 0, (
+            'Проверьте, что задание со сбоем не идет на следующие этапы'
+        )
+        assert tenant.current_timestamp == 100
+        assert len(bot.sent) == 1, (
+            'Проверьте, что о сбое сообщается как в poll_tenant'
+        )
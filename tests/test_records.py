@@ -0,0 +1,70 @@
+import pytest
+
+
+class TestRecords:
+
+    def test_validate_collects_all_errors(self):
+        import homework
+
+        records, errors = homework.validate_homeworks([
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved',
+             'date_updated': '2022-01-02'},
+            {'homework_name': 'hw2'},
+            {'homework_name': 'hw3', 'status': 'unknown'},
+            {'homework_name': 'hw4', 'status': 'reviewing'},
+        ])
+        assert [record.key for record in records] == ['1', 'hw4']
+        assert len(errors) == 2, (
+            'Проверьте, что сообщается обо всех некорректных работах сразу'
+        )
+        assert records[0].message == homework.parse_status(
+            {'homework_name': 'hw1', 'status': 'approved'}
+        ), 'Проверьте, что текст записи совпадает с parse_status'
+        with pytest.raises(AttributeError):
+            records[0].status = 'rejected'
+        assert not hasattr(records[0], '__dict__'), (
+            'Проверьте, что у записи нет словаря атрибутов'
+        )
+
+    def test_unhashable_status_is_reported(self):
+        import homework
+
+        records, errors = homework.validate_homeworks([
+            {'homework_name': 'hw1', 'status': ['approved']},
+            {'homework_name': 'hw2', 'status': {'a': 1}},
+            {'homework_name': 'hw3', 'status': 'approved'},
+        ])
+        assert [record.key for record in records] == ['hw3']
+        assert len(errors) == 2, (
+            'Проверьте, что статус неверного типа не прерывает разбор'
+        )
+
+    def test_poll_once_keeps_valid_records(self, monkeypatch):
+        import homework
+        import requests
+        from exceptions import HomeworksError
+        from tenants import Tenant
+        from test_engine import RecordingBot
+
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return {
+                    'homeworks': [
+                        {'homework_name': 'bad', 'status': 'lost'},
+                        {'homework_name': 'good', 'status': 'approved'},
+                    ],
+                    'current_date': 5,
+                }
+
+        monkeypatch.setattr(requests, 'get', lambda *a, **k: Response())
+        tenant = Tenant(token='token', chat_id='1')
+        bot = RecordingBot()
+        with pytest.raises(HomeworksError):
+            homework.poll_once(bot, tenant)
+        assert len(bot.sent) == 1, (
+            'Проверьте, что корректные работы обрабатываются '
+            'несмотря на некорректные'
+        )
+        assert tenant.current_timestamp == 5
@@ -0,0 +1,71 @@
+class TestResponseCache:
+
+    def test_memory_ttl_and_lru(self):
+        from response_cache import MemoryCache, cache_key
+
+        cache = MemoryCache(size=2, ttl=60)
+        first, second, third = (
+            cache_key('token', date) for date in (1, 2, 3)
+        )
+        assert 'token' not in first, (
+            'Проверьте, что токен не попадает в ключ кэша'
+        )
+        cache.put(first, {'homeworks': []}, now=0)
+        cache.put(second, {'homeworks': []}, now=0)
+        assert cache.get(first, now=10) == {'homeworks': []}
+        cache.put(third, {'homeworks': []}, now=10)
+        assert cache.get(second, now=10) is None, (
+            'Проверьте, что вытесняется давно не читанная запись'
+        )
+        assert cache.get(first, now=61) is None, (
+            'Проверьте, что устаревшая запись не отдается'
+        )
+        stats = cache.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 2
+        assert round(stats['hit_ratio'], 2) == 0.33
+
+    def test_sqlite_shared_between_instances(self, tmp_path):
+        from response_cache import SQLiteCache
+
+        path = str(tmp_path / 'responses.sqlite3')
+        writer = SQLiteCache(path, size=10, ttl=60)
+        reader = SQLiteCache(path, size=10, ttl=60)
+        answer = {'homeworks': [{'status': 'approved'}], 'current_date': 5}
+        writer.put('key', answer, now=0)
+        assert reader.get('key', now=30) == answer, (
+            'Проверьте, что кэш SQLite виден другим процессам'
+        )
+        assert reader.get('key', now=60) is None
+        for number in range(30):
+            writer.put(f'key-{number}', answer, now=100)
+        assert writer.stats()['size'] <= 10, (
+            'Проверьте, что размер кэша SQLite ограничен'
+        )
+        writer.close()
+        reader.close()
+
+    def test_request_api_uses_cache(self, monkeypatch):
+        import homework
+        import requests
+        from response_cache import MemoryCache
+
+        calls = []
+
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return {'homeworks': [], 'current_date': 1}
+
+        def get(*args, **kwargs):
+            calls.append(kwargs['params'])
+            return Response()
+
+        monkeypatch.setattr(requests, 'get', get)
+        monkeypatch.setattr(homework, 'response_cache', MemoryCache())
+        for token in ('first', 'first', 'second'):
+            homework.request_api(token, 100)
+        assert len(calls) == 2, (
+            'Проверьте, что одинаковый запрос берется из кэша'
+        )
+        assert homework.response_cache.stats()['hits'] == 1
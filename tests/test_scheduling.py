@@ -0,0 +1,56 @@
+import random
+
+from exceptions import StatusCodeError
+
+
+class TestPollScheduler:
+
+    def make_scheduler(self):
+        from scheduling import PollScheduler
+
+        return PollScheduler(
+            floor=60, ceiling=3600, idle=600,
+            status_delays={'reviewing': 120}, rng=random.Random(0)
+        )
+
+    def test_reviewing_is_polled_fast(self):
+        scheduler = self.make_scheduler()
+        assert scheduler.next_delay(['approved', 'reviewing']) == 120, (
+            'Проверьте, что работа на проверке опрашивается чаще'
+        )
+
+    def test_idle_slows_down_to_ceiling(self):
+        scheduler = self.make_scheduler()
+        delays = [scheduler.next_delay(['approved']) for _ in range(10)]
+        assert delays[0] == 600 and delays == sorted(delays), (
+            'Проверьте, что без работ на проверке интервал растет'
+        )
+        assert delays[-1] == 3600
+        assert scheduler.next_delay(['reviewing']) == 120
+
+    def test_errors_back_off_with_jitter(self):
+        scheduler = self.make_scheduler()
+        delays = [
+            scheduler.next_delay([], StatusCodeError('500'))
+            for _ in range(8)
+        ]
+        assert 60 <= delays[0] <= 120
+        assert all(60 <= delay <= 3600 for delay in delays), (
+            'Проверьте, что задержка не выходит за пределы'
+        )
+        assert delays[-1] > delays[0]
+        assert scheduler.next_delay([]) == 600, (
+            'Проверьте, что после успешного опроса отсрочка сбрасывается'
+        )
+
+    def test_long_failure_streak_stays_bounded(self):
+        from scheduling import PollScheduler
+
+        scheduler = PollScheduler(floor=60.0, ceiling=3600.0,
+                                  rng=random.Random(0))
+        for _ in range(5000):
+            delay = scheduler.next_delay([], ConnectionError('timeout'))
+        assert 1800 <= delay <= 3600, (
+            'Проверьте, что отсрочка после долгой серии сбоев не растет '
+            'без предела'
+        )
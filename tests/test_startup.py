@@ -0,0 +1,42 @@
+import sys
+from os.path import abspath, dirname, join
+
+sys.path.append(join(dirname(dirname(abspath(__file__))), 'benchmarks'))
+
+
+class TestStartup:
+
+    def test_import_is_light(self):
+        import startup
+
+        result = startup.measure_import()
+        assert not result['heavy'], (
+            'Проверьте, что импорт homework не загружает '
+            f'тяжелые модули: {result["heavy"]}'
+        )
+        assert result['seconds'] < startup.IMPORT_BUDGET, (
+            f'Импорт homework занял {result["seconds"]:.3f} с, '
+            f'бюджет {startup.IMPORT_BUDGET} с'
+        )
+
+    def test_first_poll_within_budget(self):
+        import startup
+
+        result = startup.measure_first_poll()
+        assert result['seconds'] < startup.FIRST_POLL_BUDGET, (
+            f'Первый опрос через {result["seconds"]:.3f} с после запуска, '
+            f'бюджет {startup.FIRST_POLL_BUDGET} с'
+        )
+
+    def test_settings_are_read_once_explicitly(self, monkeypatch):
+        import homework
+        from settings import Settings
+
+        monkeypatch.setenv('RETRY_TIME', '5')
+        assert homework.RETRY_TIME == 600, (
+            'Проверьте, что настройки не читаются при импорте'
+        )
+        settings = Settings.from_env({'RETRY_TIME': '5',
+                                      'TELEGRAM_CHAT_RATE': '0.5'})
+        assert settings.retry_time == 5
+        assert settings.telegram_chat_rate == 0.5
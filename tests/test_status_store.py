@@ -0,0 +1,24 @@
+class TestStatusStore:
+
+    def test_only_transitions_are_changes(self, tmp_path):
+        from status_store import StatusStore
+
+        path = str(tmp_path / 'statuses.sqlite3')
+        store = StatusStore(path, cache_size=1)
+        homework = {'id': 1, 'homework_name': 'hw', 'status': 'reviewing'}
+        assert store.is_changed('tenant', homework)
+        store.save('tenant', homework)
+        assert not store.is_changed('tenant', homework), (
+            'Проверьте, что повторный статус не считается изменением'
+        )
+        assert store.is_changed('other', homework), (
+            'Проверьте, что статусы подписчиков хранятся раздельно'
+        )
+        store.close()
+
+        restarted = StatusStore(path)
+        assert not restarted.is_changed('tenant', homework), (
+            'Проверьте, что статусы переживают перезапуск'
+        )
+        homework['status'] = 'approved'
+        assert restarted.is_changed('tenant', homework)
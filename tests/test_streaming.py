@@ -0,0 +1,138 @@
+import json
+
+import pytest
+
+
+def chunked(data, size):
+    raw = json.dumps(data, ensure_ascii=False).encode()
+    return [raw[index:index + size] for index in range(0, len(raw), size)]
+
+
+class TestStreaming:
+
+    @pytest.mark.parametrize('size', [1, 7, 4096])
+    def test_records_are_read_one_by_one(self, size):
+        from streaming import iter_homeworks
+
+        data = {
+            'homeworks': [
+                {'id': index, 'homework_name': f'работа {index}',
+                 'status': 'approved', 'reviewer_comment': 'ок'}
+                for index in range(50)
+            ],
+            'current_date': 1234567890,
+        }
+        fields = {}
+        records = list(iter_homeworks(chunked(data, size), fields))
+        assert records == data['homeworks'], (
+            'Проверьте, что потоковый разбор возвращает все записи'
+        )
+        assert fields['current_date'] == 1234567890, (
+            'Проверьте, что число в конце куска не обрезается'
+        )
+
+    def test_malformed_json_raises(self):
+        from streaming import iter_homeworks
+
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_homeworks([b'{"homeworks": [{"id": 1}'], {}))
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_homeworks([b'[{"homeworks": []}]'], {}))
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_homeworks([b'{"homeworks": []} ', b'garbage'], {}))
+        assert list(iter_homeworks([b'{"homeworks": [1]}', b' \n'], {})) == [1]
+
+    def test_malformed_length_is_not_streamed(self):
+        from streaming import is_large
+
+        class Response:
+            headers = {'Content-Length': 'abc'}
+
+            def iter_content(self, size):
+                return []
+
+        assert is_large(Response()) is False, (
+            'Проверьте, что испорченный Content-Length не ломает запрос'
+        )
+        Response.headers = {}
+        assert is_large(Response()) is True
+
+    def test_batch_is_bounded_and_cursor_held_back(self):
+        from streaming import read_answer
+
+        dates = [f'2022-01-0{day}T00:00:00Z' for day in (5, 1, 4, 2, 3)]
+
+        class StreamedResponse:
+            def iter_content(self, size):
+                return chunked({
+                    'homeworks': [
+                        {'id': index, 'status': 'approved',
+                         'homework_name': 'hw', 'date_updated': date}
+                        for index, date in enumerate(dates)
+                    ],
+                    'current_date': 2000000000,
+                }, 16)
+
+        answer = read_answer(StreamedResponse(), limit=3)
+        assert [item['id'] for item in answer['homeworks']] == [1, 3, 4], (
+            'Проверьте, что остаются самые ранние работы в исходном порядке'
+        )
+        assert answer['current_date'] == 1640995200 + 2 * 86400, (
+            'Проверьте, что курсор сдвигается только до оставленных работ'
+        )
+        assert read_answer(StreamedResponse())['current_date'] == 2000000000
+
+    def test_read_answer_keeps_contract(self):
+        from streaming import read_answer
+
+        class StreamedResponse:
+            def iter_content(self, size):
+                return chunked({
+                    'current_date': 1,
+                    'homeworks': [{'id': 1, 'status': 'approved',
+                                   'homework_name': 'hw',
+                                   'reviewer_comment': 'ок'}],
+                }, 3)
+
+        answer = read_answer(StreamedResponse())
+        assert answer == {
+            'current_date': 1,
+            'homeworks': [{'id': 1, 'status': 'approved',
+                           'homework_name': 'hw'}],
+        }
+        import homework
+        assert homework.check_response(answer)
+
+
+class TestAllHomeworks:
+
+    def test_every_homework_is_sent_in_order(self, monkeypatch):
+        import requests
+
+        import homework
+        from tenants import Tenant
+
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return {
+                    'homeworks': [
+                        {'homework_name': 'new', 'status': 'approved',
+                         'date_updated': '2022-03-02T10:00:00Z'},
+                        {'homework_name': 'old', 'status': 'rejected',
+                         'date_updated': '2022-03-01T10:00:00Z'},
+                    ],
+                    'current_date': 1,
+                }
+
+        sent = []
+        monkeypatch.setattr(requests, 'get', lambda *a, **k: Response())
+        monkeypatch.setattr(
+            homework, 'deliver_message',
+            lambda bot, chat_id, text: sent.append(text)
+        )
+        homework.poll_once(None, Tenant(token='t', chat_id='1'))
+        assert [text.split('"')[1] for text in sent] == ['old', 'new'], (
+            'Проверьте, что обрабатываются все работы по порядку изменения'
+        )
@@ -0,0 +1,103 @@
+import sys
+import time
+
+
+def crash(node):
+    sys.exit(3)
+
+
+class DeadProcess:
+    exitcode = 3
+
+    def is_alive(self):
+        return False
+
+    def join(self, timeout=None):
+        pass
+
+
+class TestHashRing:
+
+    def test_adding_node_moves_few_keys(self):
+        from supervisor import HashRing
+
+        keys = [f'tenant-{number}' for number in range(2000)]
+        before = HashRing([f'0-{worker}' for worker in range(4)])
+        after = HashRing([f'0-{worker}' for worker in range(5)])
+        owners = {key: before.node_for(key) for key in keys}
+        moved = [key for key in keys if after.node_for(key) != owners[key]]
+        assert all(after.node_for(key) == '0-4' for key in moved), (
+            'Проверьте, что ключи переезжают только на новый узел'
+        )
+        assert len(moved) < len(keys) * 0.3, (
+            'Проверьте, что при добавлении узла переезжает мало ключей'
+        )
+        counts = {node: list(owners.values()).count(node)
+                  for node in before.nodes}
+        assert min(counts.values()) > len(keys) / 4 * 0.6, (
+            'Проверьте, что ключи распределяются по узлам равномерно'
+        )
+
+    def test_every_tenant_has_one_worker(self):
+        from settings import Settings
+        from supervisor import assign, ring_nodes
+        from tenants import make_tenant
+
+        settings = Settings(workers=3, shard_count=2)
+        nodes = ring_nodes(settings)
+        tenants = [make_tenant(f'token-{number}', number)
+                   for number in range(100)]
+        shards = [assign(tenants, nodes, node) for node in nodes]
+        assert sorted(
+            tenant.chat_id for shard in shards for tenant in shard
+        ) == sorted(tenant.chat_id for tenant in tenants), (
+            'Проверьте, что каждый подписчик достается ровно одному процессу'
+        )
+
+    def test_worker_settings(self):
+        from settings import Settings
+        from supervisor import worker_settings
+
+        settings = worker_settings(
+            Settings(metrics_port=9100, telegram_commands=True), '1-2', 2
+        )
+        assert settings.cursor_journal == 'cursors.1-2.log'
+        assert settings.cursor_journal_shared == 'cursors*.log'
+        assert settings.metrics_port == 9102
+        assert not settings.telegram_commands
+
+
+class TestSupervisor:
+
+    def test_restarts_crashed_worker(self):
+        from supervisor import Supervisor
+
+        supervisor = Supervisor(['0-0'], crash, backoff=0)
+        supervisor.start()
+        try:
+            supervisor.processes['0-0'].join(10)
+            supervisor.check()
+            assert supervisor.restarts['0-0'] == 1, (
+                'Проверьте, что упавший процесс учитывается'
+            )
+            supervisor.check()
+            assert supervisor.processes['0-0'] is not None, (
+                'Проверьте, что упавший процесс перезапускается'
+            )
+            supervisor.processes['0-0'].join(10)
+            supervisor.check(time.monotonic())
+            assert supervisor.alive()
+        finally:
+            supervisor.stop()
+
+    def test_backoff_after_many_crashes(self):
+        from supervisor import Supervisor
+
+        supervisor = Supervisor(['0-0'], crash, backoff=1, max_backoff=60)
+        supervisor.processes['0-0'] = DeadProcess()
+        supervisor._started['0-0'] = 0.0
+        supervisor._crashes['0-0'] = 5000
+        supervisor.check(1.0)
+        assert supervisor._next_start['0-0'] == 61.0, (
+            'Проверьте, что пауза после частых падений не больше max_backoff'
+        )
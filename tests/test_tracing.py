@@ -0,0 +1,64 @@
+import json
+import os
+
+import requests
+
+from test_engine import MockTenantResponse, RecordingBot
+
+
+class TestTracing:
+
+    def test_disabled_tracing_is_noop(self):
+        import tracing
+
+        assert tracing.span('request_api') is tracing.NOOP, (
+            'Проверьте, что без трассировки отрезки не создаются'
+        )
+        assert tracing.cycle() is tracing.NOOP
+
+    def test_spans_are_nested_and_exported(self, monkeypatch, tmp_path):
+        import homework
+        import tracing
+        from tenants import Tenant
+
+        def mock_response_get(url, headers=None, params=None, **kwargs):
+            return MockTenantResponse('t', params['from_date'])
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        path = str(tmp_path / 'trace.jsonl')
+        monkeypatch.setattr(tracing, 'enabled', True)
+        monkeypatch.setattr(tracing, 'exporter', tracing.FileExporter(path))
+        for name in ('poll_once', 'request_api', 'check_response'):
+            monkeypatch.setattr(
+                homework, name, tracing.traced(getattr(homework, name))
+            )
+        tenant = Tenant(token='t', chat_id='1', current_timestamp=100)
+        homework.poll_once(RecordingBot(), tenant)
+        tracing.exporter.flush()
+
+        with open(path, encoding='utf-8') as file:
+            spans = {
+                entry['name']: entry for entry in map(json.loads, file)
+            }
+        assert {'poll_once', 'request_api', 'http_get', 'json_decode',
+                'check_response'} <= set(spans)
+        assert len({entry['trace'] for entry in spans.values()}) == 1, (
+            'Проверьте, что отрезки цикла попадают в одну трассу'
+        )
+        assert spans['http_get']['parent'] == spans['request_api']['span']
+        assert spans['poll_once']['parent'] is None
+
+    def test_profiler_dumps_every_nth_cycle(self, tmp_path):
+        import pstats
+
+        from tracing import Profiler
+
+        profiler = Profiler(2, str(tmp_path), keep=2)
+        for _ in range(6):
+            with profiler.cycle('poll'):
+                sum(range(1000))
+        assert profiler.dumped == 3
+        assert sorted(os.listdir(tmp_path)) == [
+            f'poll-{os.getpid()}-0.prof', f'poll-{os.getpid()}-1.prof'
+        ], 'Проверьте, что хранятся только последние профили'
+        pstats.Stats(str(tmp_path / f'poll-{os.getpid()}-0.prof'))
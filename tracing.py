@@ -0,0 +1,282 @@
+"""Трассировка цикла опроса в файл JSON Lines и выборочное профилирование."""
+from __future__ import annotations
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import logs
+from settings import DEFAULTS, Settings
+
+TRACED = (
+    "poll_tenant",
+    "request_api",
+    "check_response",
+    "parse_status",
+    "validate_homeworks",
+    "deliver_message",
+)
+BUFFER_SIZE = 100
+
+enabled = False
+exporter: Optional[FileExporter] = None
+profiler: Optional[Profiler] = None
+
+current_span: ContextVar[Optional[Span]] = ContextVar(
+    "current_span", default=None
+)
+_ids = itertools.count(1)
+
+
+def new_trace() -> str:
+    """Метод получения идентификатора новой трассы."""
+    return f"{os.getpid():x}-{next(_ids):x}"
+
+
+class _Noop:
+    """Пустой контекст, когда трассировка или профилирование выключены."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, key: str, value):
+        """Метод добавления атрибута: ничего не делает."""
+
+
+NOOP = _Noop()
+
+
+class Span:
+    """Отрезок времени одного вызова внутри трассы."""
+
+    __slots__ = (
+        "name",
+        "trace",
+        "ident",
+        "parent",
+        "attributes",
+        "start",
+        "_started",
+        "_token",
+    )
+
+    def __init__(self, name: str, trace: Optional[str], attributes: dict):
+        self.name = name
+        self.trace = trace
+        self.attributes = attributes
+        self.ident = self.parent = None
+        self.start = self._started = 0.0
+        self._token = None
+
+    def set(self, key: str, value):
+        """Метод добавления атрибута отрезка."""
+        self.attributes[key] = value
+
+    def __enter__(self):
+        parent = current_span.get()
+        if parent is not None:
+            self.trace, self.parent = parent.trace, parent.ident
+        elif self.trace is None:
+            self.trace = new_trace()
+        self.ident = f"{next(_ids):x}"
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = current_span.set(self)
+        return self
+
+    def __exit__(self, kind, error, traceback):
+        duration = time.perf_counter() - self._started
+        current_span.reset(self._token)
+        entry = {
+            "trace": self.trace,
+            "span": self.ident,
+            "parent": self.parent,
+            "name": self.name,
+            "start": self.start,
+            "duration": duration,
+            "tenant": logs.current_tenant.get(),
+        }
+        if kind is not None:
+            entry["error"] = kind.__name__
+        if self.attributes:
+            entry["attributes"] = self.attributes
+        if exporter is not None:
+            exporter.export(entry)
+        return False
+
+
+def span(name: str, trace: Optional[str] = None, **attributes):
+    """Метод открытия отрезка; без трассировки — пустой контекст."""
+    if not enabled:
+        return NOOP
+    return Span(name, trace, attributes)
+
+
+class FileExporter:
+    """Отрезки в файл по одному JSON-объекту в строке.
+
+    Строки копятся в памяти и дописываются в файл по ``buffer``
+    штук, чтобы цикл опроса не ждал диска на каждом вызове.
+    """
+
+    def __init__(self, path: str, buffer: int = BUFFER_SIZE):
+        self.path = path
+        self.buffer = buffer
+        self.exported = 0
+        self._lines: List[str] = []
+        self._lock = threading.Lock()
+
+    def export(self, entry: Dict[str, object]):
+        """Метод учета завершенного отрезка."""
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self._lines.append(line)
+            self.exported += 1
+            if len(self._lines) < self.buffer:
+                return
+            lines, self._lines = self._lines, []
+        self._write(lines)
+
+    def flush(self):
+        """Метод записи накопленных отрезков."""
+        with self._lock:
+            lines, self._lines = self._lines, []
+        self._write(lines)
+
+    def _write(self, lines: List[str]):
+        if not lines:
+            return
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+
+def traced(func, name: Optional[str] = None):
+    """Декоратор, открывающий отрезок на время вызова."""
+    name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with Span(name, None, {}):
+            return func(*args, **kwargs)
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def instrument(module, names: Iterable[str] = TRACED):
+    """Метод подмены функций модуля на трассируемые.
+
+    Как и метрики, функции подменяются только при включенной
+    трассировке. Вместе с ними трассируется установка соединений
+    urllib3: ``tcp_connect`` — DNS и TCP, ``http_connect`` —
+    соединение целиком, для HTTPS вместе с TLS.
+    """
+    for name in names:
+        func = getattr(module, name)
+        if not getattr(func, "__traced__", False):
+            setattr(module, name, traced(func))
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+
+    for cls, method, name in (
+        (HTTPConnection, "_new_conn", "tcp_connect"),
+        (HTTPConnection, "connect", "http_connect"),
+        (HTTPSConnection, "connect", "http_connect"),
+    ):
+        func = cls.__dict__.get(method)
+        if func is not None and not getattr(func, "__traced__", False):
+            setattr(cls, method, traced(func, name))
+
+
+class Profiler:
+    """Профилирует каждый ``every``-й цикл и сохраняет профиль в файл.
+
+    Профили пишутся в ``directory`` в формате ``pstats``; хранятся
+    последние ``keep`` файлов на каждое имя цикла.
+    """
+
+    def __init__(
+        self,
+        every: int,
+        directory: str = DEFAULTS.profile_dir,
+        keep: int = DEFAULTS.profile_keep,
+    ):
+        self.every = every
+        self.directory = directory
+        self.keep = keep
+        self.dumped = 0
+        self._cycles: Dict[str, Iterator[int]] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def cycle(self, name: str = "cycle"):
+        """Метод получения контекста цикла: профиль или пустой.
+
+        Циклы считаются отдельно для каждого имени.
+        """
+        counter = self._cycles.get(name)
+        if counter is None:
+            counter = self._cycles.setdefault(name, itertools.count())
+        number = next(counter)
+        if number % self.every:
+            return NOOP
+        return _Profiled(self, name, number // self.every % self.keep)
+
+
+class _Profiled:
+    """Профилирование одного цикла в текущем потоке."""
+
+    def __init__(self, owner: Profiler, name: str, slot: int):
+        import cProfile
+
+        self.owner = owner
+        self.path = os.path.join(
+            owner.directory, f"{name}-{os.getpid()}-{slot}.prof"
+        )
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+        self.profile.dump_stats(self.path)
+        self.owner.dumped += 1
+        return False
+
+
+def cycle(name: str = "cycle"):
+    """Метод контекста цикла опроса для выборочного профилирования."""
+    if profiler is None:
+        return NOOP
+    return profiler.cycle(name)
+
+
+def stop():
+    """Метод записи накопленных отрезков при остановке."""
+    if exporter is not None:
+        exporter.flush()
+
+
+def setup(settings: Settings = DEFAULTS, module=None):
+    """Метод включения трассировки и профилирования по настройкам."""
+    global enabled, exporter, profiler
+    import atexit
+
+    if settings.trace_file:
+        exporter = FileExporter(settings.trace_file)
+        enabled = True
+        if module is not None:
+            instrument(module)
+        atexit.register(stop)
+    if settings.profile_every:
+        profiler = Profiler(
+            settings.profile_every, settings.profile_dir, settings.profile_keep
+        )